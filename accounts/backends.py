@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def _cache():
+    # The shared tier only: a per-process near copy would keep serving a
+    # deactivated user after another process evicted it.
+    return caches["shared"]
+
+
+def _hash_key(user_id):
+    return f"auth_user_hash:{user_id}"
+
+
+def _user_key(user_id, auth_hash):
+    return f"auth_user:{user_id}:{auth_hash}"
+
+
+def invalidate_users(*user_ids):
+    _cache().delete_many([_hash_key(user_id) for user_id in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that serves the per-request user lookup from the cache.
+
+    AuthenticationMiddleware resolves ``request.user`` through get_user() on
+    every request. The loaded row is cached under its id and session auth
+    hash (an HMAC of the password hash), found through a small per-user
+    entry holding the current hash. Saves and deletes drop that entry (see
+    accounts.signals), and an entry cached before a password change can
+    never be found under the new hash, so password changes and
+    deactivations log sessions out as before.
+    """
+
+    def get_user(self, user_id):
+        cache = _cache()
+        auth_hash = cache.get(_hash_key(user_id))
+        user = cache.get(_user_key(user_id, auth_hash)) if auth_hash else None
+        if user is None:
+            try:
+                user = get_user_model()._default_manager.get(pk=user_id)
+            except get_user_model().DoesNotExist:
+                return None
+            auth_hash = user.get_session_auth_hash()
+            cache.set_many(
+                {_hash_key(user_id): auth_hash, _user_key(user_id, auth_hash): user},
+                settings.USER_CACHE_TIMEOUT,
+            )
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,108 @@
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+# Version stamps must be seen by every process at once, so they skip the
+# per-process tier and live only in the shared cache.
+VERSION_CACHE = "shared"
+
+CSRF_INPUT = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CSRF_PLACEHOLDER = "__csrf_token__"
+
+
+def _version_key(model):
+    return f"version:{model._meta.label_lower}"
+
+
+def model_versions(models):
+    """Current version stamp of each model, creating missing ones."""
+    versions = caches[VERSION_CACHE]
+    keys = [_version_key(model) for model in models]
+    found = versions.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Seeding from the clock keeps a stamp lost to eviction from
+            # coming back at a value that old pages were cached under.
+            versions.add(key, time.time_ns(), None)
+            found[key] = versions.get(key)
+    return [found[key] for key in keys]
+
+
+def bump_version(*models):
+    """Invalidate every cached page built from ``models`` once the transaction commits."""
+
+    def bump():
+        versions = caches[VERSION_CACHE]
+        for model in models:
+            try:
+                versions.incr(_version_key(model))
+            except ValueError:
+                versions.add(_version_key(model), time.time_ns(), None)
+
+    transaction.on_commit(bump)
+
+
+def _bump_sender(sender, **kwargs):
+    bump_version(sender)
+
+
+def track_versions(*models):
+    """Bump a model's version whenever one of its rows is saved or deleted."""
+    for model in models:
+        label = model._meta.label_lower
+        post_save.connect(_bump_sender, sender=model, dispatch_uid=f"version_save_{label}")
+        post_delete.connect(_bump_sender, sender=model, dispatch_uid=f"version_delete_{label}")
+
+
+class CachedPageMixin:
+    """
+    Cache the rendered GET response of a view per role and model version.
+
+    ``cache_models`` lists the models the page is built from; saving or
+    deleting any of their rows bumps a version stamp that is part of the
+    cache key, so edits show up on the next request. CSRF tokens are
+    swapped for the requesting user's own on every hit, and responses with
+    pending flash messages are neither served from nor stored in the cache.
+    """
+
+    cache_models = []
+    page_cache_timeout = None
+
+    def get(self, request, *args, **kwargs):
+        key = self.get_page_cache_key(request)
+        if key is None:
+            return super().get(request, *args, **kwargs)
+
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(
+                content.replace(CSRF_PLACEHOLDER, get_token(request)), content_type=content_type
+            )
+
+        response = super().get(request, *args, **kwargs)
+        response.add_post_render_callback(lambda rendered: self.store_page(key, rendered))
+        return response
+
+    def get_page_cache_key(self, request):
+        if len(get_messages(request)):
+            return None
+        role = getattr(request.user, "role", "") or "anonymous"
+        versions = ".".join(str(version) for version in model_versions(self.cache_models))
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return f"page:{request.resolver_match.view_name}:{role}:{versions}:{path}"
+
+    def store_page(self, key, response):
+        if response.status_code != 200:
+            return
+        content = CSRF_INPUT.sub(rf"\g<1>{CSRF_PLACEHOLDER}\g<2>", response.content.decode(response.charset))
+        timeout = self.page_cache_timeout or settings.PAGE_CACHE_TIMEOUT
+        cache.set(key, (content, response["Content-Type"]), timeout)
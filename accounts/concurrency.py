@@ -0,0 +1,47 @@
+"""
+Run independent blocking queries of an async view at the same time.
+
+Django's ``acount()``/``aaggregate()`` hand every call to one shared sync
+thread, so awaiting several of them with ``asyncio.gather`` still runs the
+queries one after another. ``gather_queries`` sends each call to a small
+pool of its own, where every thread holds its own database connection, so
+a dashboard waits for its slowest figure instead of the sum of all of them.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+
+@cache
+def query_executor():
+    # One pool per process, shared by every event loop (async_to_sync starts
+    # a new loop per request under WSGI), so connections outlive a request
+    # and their number stays bounded by ASYNC_QUERY_THREADS.
+    return ThreadPoolExecutor(max_workers=settings.ASYNC_QUERY_THREADS, thread_name_prefix="query")
+
+
+def _on_own_connection(function):
+    def run():
+        # Drops connections past CONN_MAX_AGE or left broken by the last call;
+        # no request_started/finished signal reaches these threads.
+        close_old_connections()
+        try:
+            return function()
+        finally:
+            close_old_connections()
+
+    return run
+
+
+async def gather_queries(*functions):
+    """Call each sync ``function`` on the query pool and return their results in order."""
+    return await asyncio.gather(
+        *(
+            sync_to_async(_on_own_connection(function), thread_sensitive=False, executor=query_executor())()
+            for function in functions
+        )
+    )
@@ -1,34 +1,46 @@
+from asgiref.sync import iscoroutinefunction
 from django.core.exceptions import PermissionDenied
 from functools import wraps
 
 def role_required(allowed_roles=None):
     """
     Decorator to check if a user has the appropriate role to access a view.
-    
+
+    Works on both sync and ``async def`` views; async views load the user
+    with ``request.auser()`` so the check never blocks the event loop.
+
     :param allowed_roles: A list of roles that are allowed to access the view.
     """
     if allowed_roles is None:
         allowed_roles = []
 
+    def check(user):
+        # Check if the user is authenticated
+        if not user.is_authenticated:
+            raise PermissionDenied  # Not logged in, deny access
+
+        # The role column is stored on the user row, so no child-table lookups
+        if not (user.role and user.role in allowed_roles):
+            # If user doesn't have the required role, deny access
+            raise PermissionDenied
+
     def decorator(view_func):
-        @wraps(view_func)
-        def _wrapped_view(request, *args, **kwargs):
-            user = request.user
+        if iscoroutinefunction(view_func):
 
-            # Check if the user is authenticated
-            if not user.is_authenticated:
-                raise PermissionDenied  # Not logged in, deny access
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                user = await request.auser()
+                check(user)
+                # Templates read request.user; hand them the loaded user.
+                request.user = user
+                return await view_func(request, *args, **kwargs)
 
-            # Check for specific roles based on inheritance
-            if hasattr(user, 'admin') and 'admin' in allowed_roles:
-                return view_func(request, *args, **kwargs)
-            elif hasattr(user, 'staff') and 'staff' in allowed_roles:
-                return view_func(request, *args, **kwargs)
-            elif hasattr(user, 'librarian') and 'librarian' in allowed_roles:
-                return view_func(request, *args, **kwargs)
+        else:
 
-            # If user doesn't have the required role, deny access
-            raise PermissionDenied
+            @wraps(view_func)
+            def _wrapped_view(request, *args, **kwargs):
+                check(request.user)
+                return view_func(request, *args, **kwargs)
 
         return _wrapped_view
 
@@ -1,9 +1,30 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 from accounts.models import Admin, Staff, Librarian, Student
+from accounts.thumbnails import schedule_thumbnails
 from django.forms.widgets import DateInput
 
 
-class BaseCustomUserForm(forms.ModelForm):
+class ProfilePictureMixin:
+    """Build thumbnails of a newly uploaded profile picture once it is saved."""
+
+    new_picture_pixels = None
+
+    def clean_profile_picture(self):
+        profile_picture = self.cleaned_data.get("profile_picture")
+        if isinstance(profile_picture, UploadedFile):
+            # ImageField has already opened the upload with Pillow.
+            width, height = profile_picture.image.size
+            self.new_picture_pixels = width * height
+        return profile_picture
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        if self.new_picture_pixels is not None and self.instance.profile_picture:
+            schedule_thumbnails(self.instance.profile_picture.name, self.new_picture_pixels)
+
+
+class BaseCustomUserForm(ProfilePictureMixin, forms.ModelForm):
     password1 = forms.CharField(
         label="Password",
         widget=forms.PasswordInput,
@@ -50,6 +71,7 @@ class BaseCustomUserForm(forms.ModelForm):
             user.set_password(self.cleaned_data["password1"])
         if commit:
             user.save()
+            self._save_m2m()
         return user
 
 
@@ -116,7 +138,7 @@ class AdminForm(BaseCustomUserForm):
     )
 
     def clean_profile_picture(self):
-        profile_picture = self.cleaned_data.get("profile_picture")
+        profile_picture = super().clean_profile_picture()
         if profile_picture:
             return profile_picture
         return self.instance.profile_picture
@@ -248,7 +270,7 @@ class LibrarianForm(BaseCustomUserForm):
     )
 
 
-class StudentForm(forms.ModelForm):
+class StudentForm(ProfilePictureMixin, forms.ModelForm):
     class Meta:
         model = Student
         fields = [
@@ -306,7 +328,25 @@ class StudentForm(forms.ModelForm):
     )
 
     def clean_profile_picture(self):
-        profile_picture = self.cleaned_data.get("profile_picture")
+        profile_picture = super().clean_profile_picture()
         if profile_picture:
             return profile_picture
         return self.instance.profile_picture
+
+
+class PeopleImportForm(forms.Form):
+    KIND_CHOICES = [("student", "Students"), ("staff", "Staff")]
+
+    kind = forms.ChoiceField(
+        choices=KIND_CHOICES, widget=forms.Select(attrs={"class": "form-select"})
+    )
+    file = forms.FileField(
+        help_text="CSV or XLSX file with a header row.",
+        widget=forms.ClearableFileInput(attrs={"class": "form-control"}),
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data.get("file")
+        if file and not file.name.lower().endswith((".csv", ".xlsx")):
+            raise forms.ValidationError("Upload a .csv or .xlsx file.")
+        return file
@@ -0,0 +1,70 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+# Batches smaller than this are hashed inline; starting processes costs more.
+MIN_POOL_BATCH = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker(settings_module):
+    # Spawned (non-forked) workers start without configured settings.
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_WORKERS,
+                initializer=_init_worker,
+                initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", ""),),
+            )
+        return _pool
+
+
+def shutdown():
+    """Stop the worker processes, if any were started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+atexit.register(shutdown)
+
+
+def hash_password(raw_password):
+    """
+    Hash a single password in the calling process.
+
+    One hash gains nothing from another process, so single saves stay
+    inline and the caller gets the same result as make_password().
+    """
+    return make_password(raw_password)
+
+
+def hash_passwords(raw_passwords):
+    """
+    Hash many passwords across the worker pool.
+
+    Returns the hashes in the same order as ``raw_passwords``.
+    """
+    raw_passwords = list(raw_passwords)
+    workers = settings.PASSWORD_HASHING_WORKERS
+    if workers <= 1 or len(raw_passwords) < MIN_POOL_BATCH:
+        return [make_password(raw_password) for raw_password in raw_passwords]
+
+    chunksize = max(1, len(raw_passwords) // (workers * 4))
+    return list(_get_pool().map(make_password, raw_passwords, chunksize=chunksize))
@@ -0,0 +1,177 @@
+import heapq
+import os
+import tempfile
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from accounts.models import StoredFile, User, media_storage
+from accounts.thumbnails import thumbnail_names
+
+
+def _walk(storage, directory):
+    """Yield the name of every file under ``directory``, one directory entry at a time."""
+    pending = [storage.path(directory)]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield os.path.relpath(entry.path, storage.location).replace(os.sep, "/")
+
+
+def _sort_runs(names, workspace, chunk_size):
+    """
+    Sort ``names`` into files in ``workspace``, ``chunk_size`` names at a time.
+
+    Each chunk is sorted in memory and spilled as one sorted run; read them
+    back in order with _merge_runs.
+    """
+    runs, chunk = [], []
+
+    def spill():
+        chunk.sort()
+        run = tempfile.TemporaryFile("w+", dir=workspace, encoding="utf-8")
+        run.writelines(f"{name}\n" for name in chunk)
+        run.seek(0)
+        runs.append(run)
+        chunk.clear()
+
+    for name in names:
+        chunk.append(name)
+        if len(chunk) >= chunk_size:
+            spill()
+    if chunk:
+        spill()
+    return runs
+
+
+def _merge_runs(runs):
+    """Yield the names in sorted ``runs`` in order and without repeats."""
+    previous = None
+    try:
+        for line in heapq.merge(*runs):
+            name = line[:-1]
+            if name != previous:
+                yield name
+                previous = name
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _merge_orphans(on_disk, referenced):
+    """Yield the names of ``on_disk`` missing from ``referenced``; both sorted."""
+    wanted = next(referenced, None)
+    for name in on_disk:
+        while wanted is not None and wanted < name:
+            wanted = next(referenced, None)
+        if name != wanted:
+            yield name
+
+
+class Command(BaseCommand):
+    help = (
+        "Find profile pictures and thumbnails on disk that no user refers to, "
+        "and report them or, with --delete, remove them. Only files untouched "
+        "for the grace period are considered."
+    )
+
+    # Names per DELETE/IN query, under SQLite's bound-parameter limit.
+    batch_size = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delete", action="store_true", help="Delete the orphans instead of listing them.")
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Leave files modified more recently than this alone.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=50_000,
+            help="Paths held in memory at once while sorting.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        cutoff = time.time() - options["grace_hours"] * 3600
+        upload_to = User._meta.get_field("profile_picture").upload_to.rstrip("/")
+        roots = [(media_storage, upload_to), (default_storage, f"thumbnails/{upload_to}")]
+
+        self.scanned = self.recent = self.orphans = self.freed = self.deleted = 0
+        with tempfile.TemporaryDirectory(prefix="gc_media-") as workspace:
+            # The references are read before the directories are walked, so a
+            # file uploaded in between is newer than the grace period and kept.
+            referenced = _sort_runs(self.referenced_names(), workspace, options["chunk_size"])
+            on_disk = _sort_runs(self.files(roots), workspace, options["chunk_size"])
+
+            batch = []
+            for name in _merge_orphans(_merge_runs(on_disk), _merge_runs(referenced)):
+                storage = default_storage if name.startswith("thumbnails/") else media_storage
+                try:
+                    stat = os.stat(storage.path(name))
+                except FileNotFoundError:
+                    continue
+                if stat.st_mtime > cutoff:
+                    self.recent += 1
+                    continue
+                self.orphans += 1
+                self.freed += stat.st_size
+                if not options["delete"]:
+                    self.stdout.write(name)
+                    continue
+                batch.append(name)
+                if len(batch) >= self.batch_size:
+                    self.delete(batch, options["verbosity"])
+                    batch = []
+            if batch:
+                self.delete(batch, options["verbosity"])
+
+        summary = (
+            f"Scanned {self.scanned} files: {self.orphans} orphaned ({self.freed / 1024 / 1024:.1f} MB), "
+            f"{self.recent} unreferenced but within the grace period."
+        )
+        if options["delete"]:
+            summary += f" Deleted {self.deleted}."
+        self.stdout.write(self.style.SUCCESS(f"{summary} Took {time.monotonic() - started:.1f}s."))
+
+    def referenced_names(self):
+        names = (
+            User.objects.exclude(profile_picture="")
+            .exclude(profile_picture__isnull=True)
+            .order_by()
+            .values_list("profile_picture", flat=True)
+        )
+        for name in names.iterator(chunk_size=2000):
+            yield name
+            yield from thumbnail_names(name)
+
+    def files(self, roots):
+        for storage, directory in roots:
+            if not os.path.isdir(storage.path(directory)):
+                continue
+            for name in _walk(storage, directory):
+                self.scanned += 1
+                yield name
+
+    def delete(self, names, verbosity):
+        # Someone may have been given one of these pictures since the
+        # references were read; check the originals again before removing.
+        pictures = [name for name in names if not name.startswith("thumbnails/")]
+        taken = set(User.objects.filter(profile_picture__in=pictures).values_list("profile_picture", flat=True))
+        removed = []
+        for name in names:
+            if name in taken:
+                continue
+            storage = default_storage if name.startswith("thumbnails/") else media_storage
+            storage.delete(name)
+            removed.append(name)
+            if verbosity >= 2:
+                self.stdout.write(f"Deleted {name}")
+        StoredFile.objects.filter(name__in=removed, references__lte=0).delete()
+        self.deleted += len(removed)
@@ -0,0 +1,54 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importers import PeopleImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import students or staff from a CSV or XLSX file in batched inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or XLSX file to import.")
+        parser.add_argument(
+            "--kind",
+            choices=sorted(PeopleImporter.KINDS),
+            default="student",
+            help="Type of account the rows describe.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of rows written per transaction.",
+        )
+        parser.add_argument(
+            "--report",
+            help="Write rejected rows to this CSV file instead of stdout.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        importer = PeopleImporter(options["kind"], batch_size=options["batch_size"])
+        try:
+            with open(options["path"], "rb") as file:
+                report = importer.run(read_rows(file, options["path"]))
+        except (OSError, ValueError) as exc:
+            raise CommandError(exc)
+
+        if report.errors and options["report"]:
+            with open(options["report"], "w", newline="") as output:
+                writer = csv.DictWriter(output, fieldnames=["line", "username", "error"])
+                writer.writeheader()
+                writer.writerows(report.errors)
+        else:
+            for error in report.errors:
+                self.stderr.write(f"Line {error['line']} ({error['username']}): {error['error']}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report.created} {options['kind']} rows, "
+                f"{report.failed} rejected, in {time.monotonic() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,56 @@
+import os
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from accounts.models import User
+from accounts.thumbnails import build_many, thumbnail_names
+
+
+class Command(BaseCommand):
+    help = "Build the small/medium JPEG and WebP thumbnails of every stored profile picture."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes decoding images in parallel.",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only pictures that lack one of their thumbnails.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        names = (
+            User.objects.exclude(profile_picture="")
+            .exclude(profile_picture__isnull=True)
+            .order_by("profile_picture")
+            .values_list("profile_picture", flat=True)
+            .distinct()
+        )
+        names = [name for name in names if default_storage.exists(name)]
+        if options["missing"]:
+            names = [
+                name
+                for name in names
+                if not all(default_storage.exists(thumbnail) for thumbnail in thumbnail_names(name))
+            ]
+
+        built = failed = 0
+        for name, written, error in build_many(names, options["processes"]):
+            if error:
+                failed += 1
+                self.stderr.write(f"{name}: {error}")
+            else:
+                built += 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built thumbnails for {built} pictures, {failed} failed, "
+                f"in {time.monotonic() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,97 @@
+import csv
+import time
+
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.backends import invalidate_users
+from accounts.hashing import hash_passwords
+from accounts.importers import ImportReport, read_rows
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = "Set passwords from a CSV/XLSX file with username and password columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or XLSX file with username,password rows.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of users hashed and updated per transaction.",
+        )
+        parser.add_argument(
+            "--report",
+            help="Write rejected rows to this CSV file instead of stdout.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        updated = 0
+        report = ImportReport()
+        batch = {}
+        try:
+            with open(options["path"], "rb") as file:
+                # Header is line 1, so data rows start at line 2.
+                for line, row in enumerate(read_rows(file, options["path"]), start=2):
+                    username, password = row.get("username", ""), row.get("password", "")
+                    if not username or not password:
+                        report.add_error(line, username, "Both username and password are required.")
+                        continue
+                    batch[username] = (line, password)
+                    if len(batch) >= options["batch_size"]:
+                        updated += self.update_batch(batch, report)
+                        batch = {}
+        except (OSError, ValueError) as exc:
+            raise CommandError(exc)
+        if batch:
+            updated += self.update_batch(batch, report)
+        report.errors.sort(key=lambda error: error["line"])
+
+        if report.errors and options["report"]:
+            with open(options["report"], "w", newline="") as output:
+                writer = csv.DictWriter(output, fieldnames=["line", "username", "error"])
+                writer.writeheader()
+                writer.writerows(report.errors)
+        else:
+            for error in report.errors:
+                self.stderr.write(f"Line {error['line']} ({error['username']}): {error['error']}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated {updated} passwords, {report.failed} rejected, "
+                f"in {time.monotonic() - started:.1f}s."
+            )
+        )
+
+    def update_batch(self, batch, report):
+        # The attributes UserAttributeSimilarityValidator compares against.
+        users = User.objects.filter(username__in=batch).only(
+            "pk", "username", "first_name", "last_name", "email"
+        )
+        found = set()
+        accepted = []
+        for user in users:
+            found.add(user.username)
+            line, password = batch[user.username]
+            try:
+                validate_password(password, user)
+            except ValidationError as exc:
+                report.add_error(line, user.username, " ".join(exc.messages))
+                continue
+            accepted.append(user)
+        for username, (line, _) in batch.items():
+            if username not in found:
+                report.add_error(line, username, "Unknown username.")
+
+        hashes = hash_passwords(batch[user.username][1] for user in accepted)
+        for user, password in zip(accepted, hashes):
+            user.password = password
+        with transaction.atomic():
+            User.objects.bulk_update(accepted, ["password"])
+        # bulk_update() sends no post_save, so drop the cached logins here.
+        invalidate_users(*(user.pk for user in accepted))
+        return len(accepted)
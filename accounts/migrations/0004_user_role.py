@@ -0,0 +1,36 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:27
+
+from django.db import migrations, models
+
+
+# Applied lowest precedence first so that the role previously resolved by
+# the hasattr() chain (admin, staff, librarian) wins for multi-role rows.
+ROLE_MODELS = [
+    ('student', 'Student'),
+    ('librarian', 'Librarian'),
+    ('staff', 'Staff'),
+    ('admin', 'Admin'),
+]
+
+
+def populate_roles(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    for role, model_name in ROLE_MODELS:
+        child = apps.get_model('accounts', model_name)
+        User.objects.filter(pk__in=child.objects.values('pk')).update(role=role)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_user_registration_id_registrationsequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='role',
+            field=models.CharField(blank=True, choices=[('admin', 'Admin'), ('staff', 'Staff'), ('librarian', 'Librarian'), ('student', 'Student')], db_index=True, editable=False, max_length=10),
+        ),
+        migrations.RunPython(populate_roles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:03
+
+import accounts.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_references(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    StoredFile = apps.get_model('accounts', 'StoredFile')
+    counts = (
+        User.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+        .order_by().values('profile_picture').annotate(count=Count('pk'))
+    )
+    StoredFile.objects.bulk_create(
+        StoredFile(name=row['profile_picture'], references=row['count']) for row in counts
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('references', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, storage=accounts.storage.ContentAddressedStorage(), upload_to='profile_picture/'),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
@@ -1,19 +1,135 @@
 from django.contrib.auth.models import AbstractUser
-from django.contrib.auth.hashers import make_password
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Max
 from datetime import datetime
-import random
+
+from .hashing import hash_password
+from .storage import ContentAddressedStorage
+
+media_storage = ContentAddressedStorage()
+
+
+class RegistrationSequence(models.Model):
+    """Per-prefix, per-year counter used to hand out registration IDs."""
+
+    prefix = models.CharField(max_length=3)
+    year = models.PositiveIntegerField()
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ["prefix", "year"]
+
+    def __str__(self):
+        return f"{self.prefix}{self.year} - {self.last_value}"
+
+    @staticmethod
+    def format_id(prefix, year, number):
+        return f"{prefix}{year}{number:04d}"
+
+    @classmethod
+    def reserve(cls, prefix, count=1, year=None):
+        """
+        Atomically reserve ``count`` consecutive registration IDs.
+
+        The conditional ``UPDATE`` takes the row lock (MySQL) or the database
+        write lock (SQLite) until the transaction ends, so concurrent callers
+        always receive disjoint blocks.
+        """
+        if count < 1:
+            return []
+        year = year or datetime.now().year
+        sequence = cls.objects.filter(prefix=prefix, year=year)
+
+        with transaction.atomic():
+            if not sequence.update(last_value=F("last_value") + count):
+                cls._create_sequence(prefix, year)
+                sequence.update(last_value=F("last_value") + count)
+            last_value = sequence.values_list("last_value", flat=True).get()
+
+        return [
+            cls.format_id(prefix, year, number)
+            for number in range(last_value - count + 1, last_value + 1)
+        ]
+
+    @classmethod
+    def _create_sequence(cls, prefix, year):
+        # Start after any IDs issued before the sequence existed for this year.
+        latest = User.objects.filter(
+            registration_id__startswith=f"{prefix}{year}"
+        ).aggregate(latest=Max("registration_id"))["latest"]
+        suffix = latest[len(prefix) + len(str(year)):] if latest else ""
+        start = int(suffix) if suffix.isdigit() else 0
+        try:
+            with transaction.atomic():
+                cls.objects.create(prefix=prefix, year=year, last_value=start)
+        except IntegrityError:
+            # Another worker created the row first; its value is authoritative.
+            pass
+
+
+class StoredFile(models.Model):
+    """How many User rows point at a content-addressed media file."""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    references = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} ({self.references})"
+
+    @classmethod
+    def bump(cls, name, delta):
+        """Add ``delta`` references to ``name``; returns True when it drops to none."""
+        if cls.objects.filter(name=name).update(references=F("references") + delta):
+            return delta < 0 and cls.objects.filter(name=name, references__lte=0).exists()
+        if delta < 0:
+            return False
+        try:
+            with transaction.atomic():
+                cls.objects.create(name=name, references=delta)
+        except IntegrityError:
+            # Created concurrently; add to the row that won.
+            cls.objects.filter(name=name).update(references=F("references") + delta)
+        return False
+
+    @classmethod
+    def rebuild(cls):
+        counts = (
+            User.objects.exclude(profile_picture="")
+            .exclude(profile_picture__isnull=True)
+            .order_by()
+            .values("profile_picture")
+            .annotate(count=Count("pk"))
+        )
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                (cls(name=row["profile_picture"], references=row["count"]) for row in counts.iterator()),
+                batch_size=1000,
+            )
 
 
 class User(AbstractUser):
     GENDER_CHOICES = [("M", "Male"), ("F", "Female"), ("O", "Other")]
-    registration_id = models.CharField(max_length=10, unique=True, editable=False)
+    ADMIN = "admin"
+    STAFF = "staff"
+    LIBRARIAN = "librarian"
+    STUDENT = "student"
+    ROLE_CHOICES = [
+        (ADMIN, "Admin"),
+        (STAFF, "Staff"),
+        (LIBRARIAN, "Librarian"),
+        (STUDENT, "Student"),
+    ]
+    role = models.CharField(
+        max_length=10, choices=ROLE_CHOICES, blank=True, db_index=True, editable=False
+    )
+    registration_id = models.CharField(max_length=16, unique=True, editable=False)
     phone_number = models.CharField(max_length=15, null=True)
     address = models.TextField(null=True)
     date_of_birth = models.DateField(null=True)
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES, null=True)
     profile_picture = models.ImageField(
-        upload_to="profile_picture/", null=True, blank=True
+        upload_to="profile_picture/", storage=media_storage, null=True, blank=True
     )
     emergency_contact = models.CharField(max_length=15, blank=True)
     joining_date = models.DateField(null=True)
@@ -22,18 +138,11 @@ class User(AbstractUser):
         if self.password and not self.password.startswith(
             ("pbkdf2_sha256$", "bcrypt$", "argon2")
         ):
-            self.password = make_password(self.password)
+            self.password = hash_password(self.password)
         super().save(*args, **kwargs)
 
-    # TODO change randint
-
     def generate_registration_id(self, prefix):
-        year = datetime.now().year
-        while True:
-            random_number = random.randint(1000, 9999)
-            registration_id = f"{prefix}{year}{random_number}"
-            if not User.objects.filter(registration_id=registration_id).exists():
-                return registration_id
+        return RegistrationSequence.reserve(prefix)[0]
 
     def __str__(self):
         return f"{self.username} - {self.registration_id}"
@@ -52,6 +161,7 @@ class Admin(User):
     def save(self, *args, **kwargs):
         if not self.registration_id:
             self.registration_id = self.generate_registration_id(prefix="ADM")
+        self.role = User.ADMIN
         super().save(*args, **kwargs)
 
 
@@ -69,6 +179,7 @@ class Staff(User):
     def save(self, *args, **kwargs):
         if not self.registration_id:
             self.registration_id = self.generate_registration_id(prefix="STF")
+        self.role = User.STAFF
         super().save(*args, **kwargs)
 
 
@@ -92,6 +203,7 @@ class Librarian(User):
     def save(self, *args, **kwargs):
         if not self.registration_id:
             self.registration_id = self.generate_registration_id(prefix="LIB")
+        self.role = User.LIBRARIAN
         super().save(*args, **kwargs)
 
 
@@ -108,6 +220,7 @@ class Student(User):
     def save(self, *args, **kwargs):
         if not self.registration_id:
             self.registration_id = self.generate_registration_id(prefix="STU")
+        self.role = User.STUDENT
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -0,0 +1,152 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginationMixin:
+    """
+    Cursor pagination for ListViews that keeps the queryset's own ordering.
+
+    Each page seeks past the last row of the previous one with a
+    ``WHERE (ordering columns) > (cursor values)`` filter instead of an
+    OFFSET scan. The primary key is appended to the ordering as a tie-breaker
+    so cursors are stable even when the leading columns repeat.
+    """
+
+    paginate_by = 50
+    cursor_kwarg = "cursor"
+
+    def get_keyset_ordering(self, queryset):
+        return keyset_ordering(queryset)
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_keyset_ordering(queryset)
+        direction, values = self.decode_cursor(self.request.GET.get(self.cursor_kwarg))
+        if direction == "previous":
+            ordering = [_reverse(field) for field in ordering]
+        seeking = self.seek(queryset.order_by(*ordering), ordering, values)
+        if seeking is None:
+            # No cursor, or one that does not fit this list: the first page.
+            direction, values = "next", None
+            ordering = self.get_keyset_ordering(queryset)
+            queryset = queryset.order_by(*ordering)
+        else:
+            queryset = seeking
+
+        rows = list(queryset[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if direction == "previous":
+            rows.reverse()
+            ordering = [_reverse(field) for field in ordering]
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or direction == "previous":
+                next_cursor = self.encode_cursor("next", _row_values(rows[-1], ordering))
+            if values is not None and (has_more or direction == "next"):
+                previous_cursor = self.encode_cursor("previous", _row_values(rows[0], ordering))
+
+        page = KeysetPage(rows, next_cursor, previous_cursor)
+        return (None, page, page.object_list, page.has_other_pages())
+
+    def seek(self, queryset, ordering, values):
+        """``queryset`` past ``values``, or None if they cannot be compared."""
+        if values is None or len(values) != len(ordering):
+            return None
+        try:
+            # Building the lookups converts each value for its column.
+            return queryset.filter(seek_filter(ordering, values))
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get("page_obj")
+        if page is not None:
+            context["next_page_query"] = self.page_query(page.next_cursor)
+            context["previous_page_query"] = self.page_query(page.previous_cursor)
+        return context
+
+    def page_query(self, cursor):
+        """Current query string (filters included) pointing at ``cursor``."""
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query[self.cursor_kwarg] = cursor
+        return query.urlencode()
+
+    def encode_cursor(self, direction, values):
+        payload = json.dumps([direction, values], cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return "next", None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            direction, values = json.loads(base64.urlsafe_b64decode(padded))
+        except (ValueError, TypeError, binascii.Error):
+            # A malformed cursor falls back to the first page.
+            return "next", None
+        if direction not in ("next", "previous") or not isinstance(values, list):
+            return "next", None
+        if not all(isinstance(value, (str, int, float)) for value in values):
+            # Cursors only ever hold scalars; lists, objects and nulls are forged.
+            return "next", None
+        return direction, values
+
+
+def keyset_ordering(queryset):
+    """The queryset's ordering with the primary key appended as a tie-breaker."""
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+    if not ordering or ordering[-1].lstrip("-") not in ("pk", "id"):
+        ordering.append("pk")
+    return ordering
+
+
+def _reverse(field):
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+def _row_values(obj, ordering):
+    values = []
+    for field in ordering:
+        value = obj
+        for part in field.lstrip("-").split("__"):
+            value = getattr(value, part)
+        values.append(value)
+    return values
+
+
+def seek_filter(ordering, values):
+    """Build ``(a, b, c) > (x, y, z)`` honouring each column's direction."""
+    clauses = []
+    for index, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        equal = {f.lstrip("-"): value for f, value in zip(ordering[:index], values)}
+        clauses.append(Q(**equal, **{f"{name}__{lookup}": values[index]}))
+    return reduce(or_, clauses)
@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .backends import invalidate_users
+from .models import StoredFile, User, media_storage
+from .thumbnails import thumbnail_names
+
+
+def forget_user(sender, instance, **kwargs):
+    # Child models (Student, Staff, ...) send signals as themselves.
+    if isinstance(instance, User):
+        invalidate_users(instance.pk)
+
+
+post_save.connect(forget_user, dispatch_uid="auth_user_cache_save")
+post_delete.connect(forget_user, dispatch_uid="auth_user_cache_delete")
+
+
+def remember_picture(sender, instance, update_fields=None, **kwargs):
+    if not isinstance(instance, User):
+        return
+    if update_fields is not None and "profile_picture" not in update_fields:
+        # e.g. last_login on every sign-in
+        instance._stored_picture = instance.profile_picture.name
+        return
+    instance._stored_picture = (
+        User.objects.filter(pk=instance.pk).values_list("profile_picture", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+def count_picture(sender, instance, raw=False, **kwargs):
+    if raw or not isinstance(instance, User):
+        return
+    previous = getattr(instance, "_stored_picture", None) or ""
+    current = instance.profile_picture.name or ""
+    if previous == current:
+        return
+    if current:
+        StoredFile.bump(current, 1)
+    if previous:
+        release_picture(previous)
+
+
+def uncount_picture(sender, instance, **kwargs):
+    if isinstance(instance, User) and instance.profile_picture:
+        release_picture(instance.profile_picture.name)
+
+
+def release_picture(name):
+    if StoredFile.bump(name, -1):
+        transaction.on_commit(lambda: delete_unreferenced(name))
+
+
+def delete_unreferenced(name):
+    """Remove a picture and its thumbnails once no row uses it any more."""
+    if media_storage.recently_reused(name):
+        # Handed to a new upload a moment ago; its row may not be counted yet.
+        return
+    if StoredFile.objects.filter(name=name, references__lte=0).delete()[0]:
+        media_storage.delete(name)
+        for thumbnail in thumbnail_names(name):
+            media_storage.delete(thumbnail)
+
+
+pre_save.connect(remember_picture, dispatch_uid="stored_file_pre_save")
+post_save.connect(count_picture, dispatch_uid="stored_file_save")
+post_delete.connect(uncount_picture, dispatch_uid="stored_file_delete")
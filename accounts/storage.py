@@ -0,0 +1,73 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# A file that was just handed out again is never deleted, in case its new
+# owner has not been saved (and counted) yet.
+REUSE_GRACE_SECONDS = 60
+
+_CONTENT_NAME = re.compile(r"(?:^|/)([0-9a-f]{2})/\1[0-9a-f]{62}(?:\.\w+)?$")
+
+
+def is_content_addressed(name):
+    return bool(_CONTENT_NAME.search(name))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that names each file after the SHA-256 of its bytes.
+
+    ``upload_to/ab/abcdef....jpg``: identical uploads map to the same name
+    and are kept once, and a name's content never changes, so it can be
+    cached by browsers for good. The hash is computed while the upload is
+    copied to a temporary file next to its destination, one chunk at a
+    time; the temporary file is then renamed into place, or discarded if
+    the content is already stored. Which rows use a file is tracked by
+    ``accounts.models.StoredFile``.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Names are final only once the content is hashed (see _save).
+        return name
+
+    def _save(self, name, content):
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        full_directory = self.path(directory)
+        os.makedirs(full_directory, exist_ok=True)
+
+        digest = hashlib.sha256()
+        descriptor, temporary = tempfile.mkstemp(dir=full_directory, prefix=".upload-")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    file.write(chunk)
+            hexdigest = digest.hexdigest()
+            name = "/".join(part for part in (directory, hexdigest[:2], hexdigest + extension) if part)
+            target = self.path(name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.exists(target):
+                os.utime(target)
+            else:
+                if self.file_permissions_mode is not None:
+                    os.chmod(temporary, self.file_permissions_mode)
+                os.replace(temporary, target)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        return name
+
+    def recently_reused(self, name):
+        try:
+            return time.time() - os.path.getmtime(self.path(name)) < REUSE_GRACE_SECONDS
+        except FileNotFoundError:
+            return False
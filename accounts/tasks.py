@@ -0,0 +1,49 @@
+from django.core.files.storage import default_storage, storages
+from django.core.management import call_command
+
+from administration.jobs import task
+from .importers import PeopleImporter, read_rows
+from .thumbnails import build_thumbnails
+
+# Rejected rows kept on the job; the rest are only counted.
+MAX_REPORTED_ERRORS = 500
+
+
+@task("accounts.import_people")
+def import_people_task(job, path, kind):
+    def progress(report):
+        job.set_progress(message=f"{report.created} imported, {report.failed} rejected")
+
+    storage = storages["imports"]
+    retrying = False
+    try:
+        with storage.open(path, "rb") as file:
+            report = PeopleImporter(kind).run(read_rows(file, path), progress=progress)
+    except ValueError as exc:
+        # An unreadable file will not get better on retry.
+        return {"created": 0, "failed": 0, "errors": [], "message": str(exc)}
+    except Exception:
+        # Kept for the next attempt, unless this one was the last.
+        retrying = job.attempts < job.max_attempts
+        raise
+    finally:
+        if not retrying:
+            storage.delete(path)
+    return {
+        "created": report.created,
+        "failed": report.failed,
+        "errors": report.errors[:MAX_REPORTED_ERRORS],
+    }
+
+
+@task("accounts.purge_sessions")
+def purge_sessions_task(job):
+    call_command("purge_sessions")
+
+
+@task("accounts.build_thumbnails")
+def build_thumbnails_task(job, name):
+    if not default_storage.exists(name):
+        # Replaced or deleted before the job ran.
+        return {"written": []}
+    return {"written": build_thumbnails(name)}
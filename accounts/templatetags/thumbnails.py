@@ -0,0 +1,21 @@
+from django import template
+
+from accounts.thumbnails import thumbnail_name
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail(picture, spec="medium"):
+    """
+    URL of a profile picture's thumbnail, e.g. ``picture|thumbnail:"small webp"``.
+
+    Falls back to the original until the thumbnail has been built.
+    """
+    if not picture:
+        return ""
+    size, _, image_format = spec.partition(" ")
+    name = thumbnail_name(picture.name, size, image_format or "jpeg")
+    if picture.storage.exists(name):
+        return picture.storage.url(name)
+    return picture.url
@@ -1,3 +1,650 @@
-from django.test import TestCase
+import base64
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings as django_settings
+from django.contrib.auth import get_user
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.views.generic import ListView
+from PIL import Image
+
+from administration.jobs import claim, run_job
+from administration.models import Job
+from library.models import Book
+from management.models import Department, Grade, GradeRollup
+from . import hashing
+from .backends import CachedModelBackend
+from .exports import keyset_rows, stream_csv, stream_xlsx
+from .management.commands import gc_media
+from .importers import PeopleImporter
+from .caching import CSRF_PLACEHOLDER
+from .models import Admin, RegistrationSequence, Staff, StoredFile, Student, User, media_storage
+from .pagination import KeysetPaginationMixin
+from .views import PeopleImportView
+from .thumbnails import build_thumbnails, thumbnail_names
+
+# Tests must not write to the file-based shared cache under BASE_DIR.
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "shared"},
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RegistrationSequenceTests(TestCase):
+    def test_blocks_are_consecutive_and_disjoint(self):
+        first = RegistrationSequence.reserve("STU", count=3, year=2026)
+        second = RegistrationSequence.reserve("STU", count=2, year=2026)
+        self.assertEqual(first, ["STU20260001", "STU20260002", "STU20260003"])
+        self.assertEqual(second, ["STU20260004", "STU20260005"])
+
+    def test_prefixes_and_years_count_separately(self):
+        RegistrationSequence.reserve("STU", count=5, year=2026)
+        self.assertEqual(RegistrationSequence.reserve("STF", year=2026), ["STF20260001"])
+        self.assertEqual(RegistrationSequence.reserve("STU", year=2027), ["STU20270001"])
+        self.assertEqual(RegistrationSequence.reserve("STU", count=0, year=2026), [])
+
+    def test_seeded_after_the_highest_existing_id(self):
+        User.objects.create(username="old1", registration_id="ADM20260042")
+        User.objects.create(username="old2", registration_id="ADM20260007")
+        self.assertEqual(RegistrationSequence.reserve("ADM", year=2026), ["ADM20260043"])
+
+    def test_losing_the_creation_race_keeps_the_winners_value(self):
+        RegistrationSequence.objects.create(prefix="LIB", year=2026, last_value=10)
+        RegistrationSequence._create_sequence("LIB", 2026)
+        self.assertEqual(RegistrationSequence.reserve("LIB", year=2026), ["LIB20260011"])
+
+    def test_saving_a_user_reserves_an_id(self):
+        year = RegistrationSequence.reserve("ADM")[0][3:7]
+        admin = Admin.objects.create(username="fresh")
+        self.assertEqual(admin.registration_id, f"ADM{year}0002")
+
+# The production layout: a per-process tier in front of the shared one.
+TIERED_CACHES = {
+    "default": {
+        "BACKEND": "school_management.cache.TieredCache",
+        "OPTIONS": {"NEAR": "near", "FAR": "shared", "NEAR_TIMEOUT": 10},
+    },
+    "near": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "near"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "shared"},
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        self.user = Admin.objects.create(username="cached", password="old-secret")
+        self.backend = CachedModelBackend()
+
+    def test_second_lookup_makes_no_queries(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk).pk, self.user.pk)
+
+    def test_deactivation_is_seen_at_once(self):
+        self.backend.get_user(self.user.pk)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_password_change_ends_existing_sessions(self):
+        self.client.force_login(self.user)
+        request = RequestFactory().get("/")
+        request.session = self.client.session
+        self.assertEqual(get_user(request).pk, self.user.pk)
+
+        self.user.set_password("new-secret")
+        self.user.save()
+        self.assertTrue(get_user(request).is_anonymous)
+
+
+@override_settings(CACHES=TIERED_CACHES)
+class CachedPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Admin.objects.create(username="head")
+        cls.staff = Staff.objects.create(username="teacher")
+        cls.grade = Grade.objects.create(standard=6, section="A")
+        cls.department = Department.objects.create(name="Science")
+        cls.book = Book.objects.create(title="Dune", author="Herbert", total_copies=1, available_copies=1)
+
+    def setUp(self):
+        # Pages and version stamps left by other tests are still in locmem.
+        cache.clear()
+
+    def get(self, user, name, client=None):
+        client = client or self.client
+        client.force_login(user)
+        response = client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def cached(self, response):
+        # Hits are served without rendering a template.
+        return not response.templates
+
+    def test_roles_never_share_a_page(self):
+        self.assertFalse(self.cached(self.get(self.admin, "grade_list")))
+        self.assertFalse(self.cached(self.get(self.staff, "grade_list")))
+        self.assertTrue(self.cached(self.get(self.staff, "grade_list")))
+        other_admin = Admin.objects.create(username="deputy")
+        self.assertTrue(self.cached(self.get(other_admin, "grade_list")))
+
+    def test_cached_page_carries_each_requests_own_csrf_token(self):
+        self.get(self.admin, "department_list")
+        other = Client(enforce_csrf_checks=True)
+        response = self.get(Admin.objects.create(username="deputy"), "department_list", client=other)
+        self.assertTrue(self.cached(response))
+        content = response.content.decode()
+        self.assertNotIn(CSRF_PLACEHOLDER, content)
+
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', content).group(1)
+        response = other.post(
+            reverse("department_create"), {"name": "Arts", "description": "", "csrfmiddlewaretoken": token}
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_edits_bump_the_version_and_rerender_the_list(self):
+        for name, instance, field, value in (
+            ("grade_list", self.grade, "section", "Q"),
+            ("department_list", self.department, "name", "Astronomy"),
+            ("book_list", self.book, "title", "Solaris"),
+        ):
+            with self.subTest(name):
+                self.get(self.admin, name)
+                self.assertTrue(self.cached(self.get(self.admin, name)))
+
+                setattr(instance, field, value)
+                with self.captureOnCommitCallbacks(execute=True):
+                    instance.save()
+                response = self.get(self.admin, name)
+                self.assertFalse(self.cached(response))
+                self.assertContains(response, value)
+
+
+def make_student(username, grade, **fields):
+    return Student.objects.create(
+        username=username,
+        grade=grade,
+        admission_date=date(2024, 6, 1),
+        parent_name="Parent",
+        parent_contact_number="9000000000",
+        **fields,
+    )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class KeysetRowsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        grades = [Grade.objects.create(standard=5, section=section) for section in "AB"]
+        for number in range(7):
+            # Repeated first names, so batches split inside runs of ties.
+            make_student(f"student{number}", grades[number % 2], first_name=f"Name{number // 3}")
+
+    def test_batches_return_every_row_once_in_order(self):
+        queryset = Student.objects.order_by("grade__standard", "first_name")
+        expected = list(queryset.order_by("grade__standard", "first_name", "pk").values_list("username"))
+        # 2 + 2 + 2 + 1 rows: the short batch ends the scan.
+        with self.assertNumQueries(4):
+            rows = list(keyset_rows(queryset, ["username"], chunk_size=2))
+        self.assertEqual(rows, expected)
+
+    def test_exact_multiple_of_batch_size(self):
+        rows = list(keyset_rows(Student.objects.order_by("-username"), ["username", "grade__section"], 7))
+        self.assertEqual([row[0] for row in rows], [f"student{n}" for n in range(6, -1, -1)])
+        self.assertEqual(len(rows[0]), 2)
+
+    def test_student_export_streams_all_rows(self):
+        self.client.force_login(Admin.objects.create(username="exporter"))
+        response = self.client.get(reverse("student_export"))
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:2], ["Registration ID", "Username"])
+        self.assertEqual(len(lines), 1 + 7)
+
+
+class ExportFormulaTests(SimpleTestCase):
+    rows = [("=HYPERLINK(\"http://x\")", "+91 900", "-1+2", "@SUM(A1)", "Asha", -5, Decimal("-2.50"))]
+
+    def test_csv_quotes_text_that_would_run_as_a_formula(self):
+        lines = "".join(stream_csv(["a", "b", "c", "d", "e", "f", "g"], iter(self.rows))).splitlines()
+        self.assertEqual(
+            next(csv.reader(lines[1:])),
+            ["'=HYPERLINK(\"http://x\")", "'+91 900", "'-1+2", "'@SUM(A1)", "Asha", "-5", "-2.50"],
+        )
+
+    def test_xlsx_quotes_formula_text_and_keeps_numbers(self):
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(stream_xlsx(list("abcdefg"), iter(self.rows)))))
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        self.assertIn("<t>'=HYPERLINK(\"http://x\")</t>", sheet)
+        self.assertIn("<t>'@SUM(A1)</t>", sheet)
+        self.assertIn("<c><v>-5</v></c>", sheet)
+        self.assertIn("<t>Asha</t>", sheet)
+
+
+class PagedStudents(KeysetPaginationMixin, ListView):
+    paginate_by = 2
+    template_name = "unused.html"
+
+    def get_queryset(self):
+        queryset = Student.objects.order_by("first_name")
+        if "grade" in self.request.GET:
+            queryset = queryset.filter(grade_id=self.request.GET["grade"])
+        return queryset
+
+
+def forged_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.grades = [Grade.objects.create(standard=6, section=section) for section in "AB"]
+        for number in range(9):
+            # Three of each first name, so pages split runs of ties.
+            make_student(f"pupil{number}", cls.grades[number % 2], first_name=f"Name{number // 3}")
+
+    def page(self, query=""):
+        request = RequestFactory().get(f"/?{query}")
+        return PagedStudents.as_view()(request).context_data
+
+    def usernames(self, context):
+        return [student.username for student in context["object_list"]]
+
+    def walk_forward(self, query=""):
+        pages, context = [], self.page(query)
+        while True:
+            pages.append(context)
+            if not context["next_page_query"]:
+                return pages
+            context = self.page(context["next_page_query"])
+
+    def test_next_pages_cover_every_row_once_in_order(self):
+        pages = self.walk_forward()
+        seen = [name for context in pages for name in self.usernames(context)]
+        expected = list(Student.objects.order_by("first_name", "pk").values_list("username", flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(self.usernames(context)) for context in pages], [2, 2, 2, 2, 1])
+        self.assertIsNone(pages[0]["previous_page_query"])
+
+    def test_previous_links_return_the_same_pages(self):
+        pages = self.walk_forward()
+        context = pages[-1]
+        for expected in reversed(pages[:-1]):
+            context = self.page(context["previous_page_query"])
+            self.assertEqual(self.usernames(context), self.usernames(expected))
+
+    def test_filters_are_kept_across_pages(self):
+        grade = self.grades[1]
+        pages = self.walk_forward(f"grade={grade.pk}")
+        self.assertIn(f"grade={grade.pk}", pages[1]["next_page_query"] or pages[1]["previous_page_query"])
+        seen = [name for context in pages for name in self.usernames(context)]
+        self.assertEqual(sorted(seen), sorted(Student.objects.filter(grade=grade).values_list("username", flat=True)))
+
+    def test_forged_cursors_fall_back_to_the_first_page(self):
+        first = self.usernames(self.page())
+        for payload in (
+            ["next", [["Name0"], {"a": 1}]],
+            ["next", ["Name0"]],
+            ["next", ["Name0", 1, 2]],
+            ["next", [None, 1]],
+            ["next", ["Name0", "not-a-number"]],
+            ["sideways", ["Name0", 1]],
+            "garbage",
+        ):
+            with self.subTest(payload=payload):
+                context = self.page(f"cursor={forged_cursor(payload)}")
+                self.assertEqual(self.usernames(context), first)
+        self.assertEqual(self.usernames(self.page("cursor=%%%")), first)
+
+
+def student_row(username, **fields):
+    return {
+        "username": username,
+        "first_name": "First",
+        "last_name": "Last",
+        "grade": "8-A",
+        "gender": "F",
+        "admission_date": "2024-06-01",
+        "date_of_birth": "2012-01-01",
+        "parent_name": "Parent",
+        "parent_contact_number": "9000000000",
+        "address": "1 School Road",
+        **fields,
+    }
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ImporterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.grade = Grade.objects.create(standard=8, section="A")
+        make_student("taken", cls.grade)
+
+    def run_import(self, rows, batch_size=500):
+        return PeopleImporter(User.STUDENT, batch_size=batch_size).run(iter(rows))
+
+    def test_child_rows_are_inserted(self):
+        report = self.run_import([student_row("new1", first_name="Asha"), student_row("new2")])
+        self.assertEqual((report.created, report.errors), (2, []))
+
+        student = Student.objects.select_related("grade").get(username="new1")
+        self.assertEqual(student.first_name, "Asha")
+        self.assertEqual(student.grade, self.grade)
+        self.assertEqual(student.parent_contact_number, "9000000000")
+        self.assertEqual(student.role, User.STUDENT)
+        self.assertTrue(student.registration_id.startswith("STU"))
+        # Parent and child rows share their primary keys.
+        self.assertEqual(User.objects.get(username="new1").pk, student.pk)
+        self.assertEqual(GradeRollup.objects.get(grade=self.grade).student_count, 3)
+
+    def test_rejected_rows_are_reported_by_line(self):
+        report = self.run_import(
+            [
+                student_row("good"),
+                student_row("nograde", grade="99-Z"),
+                student_row("nodate", admission_date=""),
+                student_row("taken"),
+            ]
+        )
+        self.assertEqual(report.created, 1)
+        self.assertEqual([(error["line"], error["username"]) for error in report.errors], [
+            (3, "nograde"),
+            (4, "nodate"),
+            (5, "taken"),
+        ])
+        self.assertIn("Unknown grade", report.errors[0]["error"])
+        self.assertIn("admission_date", report.errors[1]["error"])
+        self.assertIn("already exists", report.errors[2]["error"])
+
+    def test_duplicate_usernames_within_a_chunk(self):
+        report = self.run_import([student_row("twin"), student_row("other"), student_row("twin")], batch_size=3)
+        self.assertEqual(report.created, 2)
+        self.assertEqual([(error["line"], error["username"]) for error in report.errors], [(4, "twin")])
+        self.assertEqual(Student.objects.filter(username="twin").count(), 1)
+
+    def test_chunks_get_disjoint_registration_ids(self):
+        report = self.run_import([student_row(f"bulk{number}") for number in range(5)], batch_size=2)
+        self.assertEqual(report.created, 5)
+        ids = list(Student.objects.values_list("registration_id", flat=True))
+        self.assertEqual(len(set(ids)), len(ids))
+
+
+class HashPasswordsTests(TestCase):
+    def test_hashes_keep_their_order(self):
+        passwords = [f"secret-{number}" for number in range(6)]
+        for workers in (1, 2):
+            with self.subTest(workers=workers), override_settings(PASSWORD_HASHING_WORKERS=workers):
+                self.addCleanup(hashing.shutdown)
+                hashes = hashing.hash_passwords(iter(passwords))
+                self.assertEqual(len(hashes), len(passwords))
+                self.assertTrue(all(map(check_password, passwords, hashes)))
+                self.assertFalse(check_password(passwords[0], hashes[1]))
+
+    def test_small_batches_are_hashed_inline(self):
+        with override_settings(PASSWORD_HASHING_WORKERS=4):
+            self.assertTrue(check_password("only-one", hashing.hash_passwords(["only-one"])[0]))
+        self.assertIsNone(hashing._pool)
+
+
+@override_settings(CACHES=TEST_CACHES, PASSWORD_HASHING_WORKERS=1)
+class ResetPasswordsTests(TestCase):
+    def setUp(self):
+        self.admin = Admin.objects.create(username="head", first_name="Meera")
+        self.other = Admin.objects.create(username="deputy")
+
+    def reset(self, text, *args):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, "w") as file:
+            file.write(text)
+        output, errors = io.StringIO(), io.StringIO()
+        call_command("reset_passwords", path, *args, stdout=output, stderr=errors)
+        return output.getvalue(), errors.getvalue()
+
+    def password_ok(self, user, password):
+        return User.objects.get(pk=user.pk).check_password(password)
+
+    def test_valid_rows_are_set_and_bad_ones_reported_by_line(self):
+        output, errors = self.reset(
+            "username,password\n"
+            "head,Correct-Horse-42\n"
+            "deputy,\n"
+            ",Orphan-Row-99\n"
+            "ghost,Another-Pass-77\n"
+            "deputy,123\n",
+            "--batch-size", "2",
+        )
+        self.assertTrue(self.password_ok(self.admin, "Correct-Horse-42"))
+        self.assertFalse(self.password_ok(self.other, "123"))
+        self.assertIn("Updated 1 passwords, 4 rejected", output)
+        lines = errors.splitlines()
+        self.assertEqual([line.split(" ", 2)[1] for line in lines], ["3", "4", "5", "6"])
+        self.assertIn("required", lines[0])
+        self.assertIn("Unknown username", lines[2])
+        self.assertIn("too short", lines[3])
+
+    def test_passwords_like_the_user_are_rejected(self):
+        self.reset("username,password\nhead,meera\n")
+        self.assertFalse(self.password_ok(self.admin, "meera"))
+
+    def test_rejected_rows_go_to_the_report_file(self):
+        handle, report = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        self.addCleanup(os.remove, report)
+        output, errors = self.reset("username,password\nnobody,Long-Enough-123\n", "--report", report)
+        self.assertEqual(errors, "")
+        with open(report) as file:
+            self.assertEqual(file.read().splitlines(), ["line,username,error", "2,nobody,Unknown username."])
+
+
+def jpeg(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), color).save(buffer, "JPEG")
+    return ContentFile(buffer.getvalue())
+
+
+class MediaTestCase(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp(prefix="media-tests-")
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root, CACHES=TEST_CACHES)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def set_picture(self, user, content, name="upload.jpg"):
+        with self.captureOnCommitCallbacks(execute=True):
+            user.profile_picture.save(name, content, save=True)
+        return user.profile_picture.name
+
+    def age(self, name, seconds=3600):
+        then = os.path.getmtime(media_storage.path(name)) - seconds
+        os.utime(media_storage.path(name), (then, then))
+
+    def references(self, name):
+        return StoredFile.objects.filter(name=name).values_list("references", flat=True).first()
+
+
+class BackgroundImportTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        import_root = tempfile.mkdtemp(prefix="import-tests-")
+        self.addCleanup(shutil.rmtree, import_root)
+        imports = {"BACKEND": "django.core.files.storage.FileSystemStorage", "OPTIONS": {"location": import_root}}
+        settings = override_settings(STORAGES={**django_settings.STORAGES, "imports": imports})
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.grade = Grade.objects.create(standard=8, section="A")
+
+    def upload(self):
+        self.client.force_login(Admin.objects.create(username="head"))
+        rows = "\n".join(",".join(student_row(name).values()) for name in ("big1", "big2"))
+        content = ",".join(student_row("header")) + "\n" + rows + "\n"
+        upload = SimpleUploadedFile("people.csv", content.encode(), content_type="text/csv")
+        with mock.patch.object(PeopleImportView, "inline_max_bytes", 10):
+            response = self.client.post(reverse("people_import"), {"kind": "student", "file": upload})
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse("job_detail", args=[job.pk]), fetch_redirect_response=False)
+        return job.payload["path"]
+
+    def test_pending_upload_is_private_and_removed_after_import(self):
+        path = self.upload()
+        self.assertTrue(storages["imports"].exists(path))
+        self.assertFalse(os.listdir(django_settings.MEDIA_ROOT))
+
+        self.assertTrue(run_job(claim("worker"), "worker"))
+        self.assertEqual(Job.objects.get().result["created"], 2)
+        self.assertFalse(storages["imports"].exists(path))
+
+    def test_upload_is_kept_for_retries_and_removed_after_the_last(self):
+        path = self.upload()
+        Job.objects.update(max_attempts=2)
+        with mock.patch.object(PeopleImporter, "run", side_effect=RuntimeError("database away")):
+            with self.assertLogs("administration.jobs", "ERROR"):
+                self.assertFalse(run_job(claim("worker"), "worker"))
+            self.assertTrue(storages["imports"].exists(path))
+
+            Job.objects.update(run_after=timezone.now())
+            with self.assertLogs("administration.jobs", "ERROR"):
+                self.assertFalse(run_job(claim("worker"), "worker"))
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+        self.assertFalse(storages["imports"].exists(path))
+
+
+class StoredFileTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = Admin.objects.create(username="first")
+        self.second = Admin.objects.create(username="second")
+
+    def test_identical_uploads_share_one_file(self):
+        name = self.set_picture(self.first, jpeg("red"), "Mine.JPG")
+        self.assertEqual(self.set_picture(self.second, jpeg("red"), "other.jpg"), name)
+        self.assertRegex(name, r"^profile_picture/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$")
+        self.assertEqual(self.references(name), 2)
+        self.assertEqual(len(os.listdir(os.path.dirname(media_storage.path(name)))), 1)
+
+    def test_replacing_moves_the_reference(self):
+        old = self.set_picture(self.first, jpeg("red"))
+        self.set_picture(self.second, jpeg("red"))
+        new = self.set_picture(self.first, jpeg("blue"))
+        self.assertEqual((self.references(old), self.references(new)), (1, 1))
+        self.assertTrue(media_storage.exists(old))
+
+    def test_saves_that_skip_the_picture_change_nothing(self):
+        name = self.set_picture(self.first, jpeg("red"))
+        self.first.first_name = "Renamed"
+        self.first.save(update_fields=["first_name"])
+        self.first.save()
+        self.assertEqual(self.references(name), 1)
+
+    def test_last_reference_gone_deletes_file_and_thumbnails(self):
+        name = self.set_picture(self.first, jpeg("red"))
+        build_thumbnails(name)
+        self.age(name)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.delete()
+        self.assertIsNone(self.references(name))
+        self.assertFalse(media_storage.exists(name))
+        self.assertFalse(any(media_storage.exists(thumbnail) for thumbnail in thumbnail_names(name)))
+
+    def test_recently_reused_file_survives_its_last_release(self):
+        name = self.set_picture(self.first, jpeg("red"))
+        # Another upload of the same bytes touched the file a moment ago.
+        self.set_picture(self.first, jpeg("blue"))
+        self.assertTrue(media_storage.exists(name))
+        self.assertEqual(self.references(name), 0)
+
+
+class GcMediaTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = Admin.objects.create(username="keeper")
+        self.kept = self.set_picture(self.user, jpeg("red"))
+        build_thumbnails(self.kept)
+        self.orphans = [
+            self.put("profile_picture/legacy.jpeg"),
+            self.put("profile_picture/legacy_Ab12Cd3.jpeg"),
+            self.put("thumbnails/profile_picture/gone_small.jpg"),
+            # Left by an upload that crashed before its rename.
+            self.put("profile_picture/ab/.upload-x1y2z3"),
+        ]
+        for name in [self.kept, *thumbnail_names(self.kept), *self.orphans]:
+            self.age(name, seconds=2 * 86400)
+
+    def put(self, name):
+        # Written in place: media_storage.save() would rename it to its hash.
+        path = media_storage.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(b"stale")
+        return name
+
+    def gc(self, *args):
+        output = io.StringIO()
+        call_command("gc_media", *args, "--chunk-size", "2", stdout=output)
+        return output.getvalue().splitlines()
+
+    def test_sorted_runs_merge_without_repeats(self):
+        with tempfile.TemporaryDirectory() as workspace:
+            runs = gc_media._sort_runs(iter(["d", "b", "a/x", "b", "a", "c"]), workspace, chunk_size=2)
+            self.assertEqual(len(runs), 3)
+            self.assertEqual(list(gc_media._merge_runs(runs)), ["a", "a/x", "b", "c", "d"])
+
+    def test_merge_yields_only_unreferenced_names(self):
+        on_disk = iter(["a", "b", "c", "e", "f"])
+        referenced = iter(["0", "b", "d", "e", "z"])
+        self.assertEqual(list(gc_media._merge_orphans(on_disk, referenced)), ["a", "c", "f"])
+        self.assertEqual(list(gc_media._merge_orphans(iter(["a"]), iter([]))), ["a"])
+
+    def test_reports_orphans_and_deletes_nothing(self):
+        lines = self.gc()
+        self.assertEqual(sorted(lines[:-1]), sorted(self.orphans))
+        self.assertIn("4 orphaned", lines[-1])
+        self.assertTrue(all(media_storage.exists(name) for name in self.orphans))
+
+    def test_delete_keeps_referenced_files_and_thumbnails(self):
+        self.gc("--delete")
+        self.assertFalse(any(media_storage.exists(name) for name in self.orphans))
+        self.assertTrue(media_storage.exists(self.kept))
+        self.assertTrue(all(media_storage.exists(name) for name in thumbnail_names(self.kept)))
+
+    def test_recent_files_are_left_alone(self):
+        fresh = self.put("profile_picture/just-uploaded.jpeg")
+        lines = self.gc("--delete")
+        self.assertTrue(media_storage.exists(fresh))
+        self.assertIn("1 unreferenced but within the grace period", lines[-1])
+        self.assertEqual(self.gc("--grace-hours", "0")[:-1], [fresh])
+
+    def test_references_are_checked_again_before_deleting(self):
+        # Handed to a user after the references were read.
+        name = self.orphans[0]
+        User.objects.filter(pk=self.user.pk).update(profile_picture=name)
+        StoredFile.objects.create(name=self.orphans[1], references=0)
+
+        command = gc_media.Command(stdout=io.StringIO())
+        command.deleted = 0
+        command.delete(self.orphans, verbosity=1)
+        self.assertTrue(media_storage.exists(name))
+        self.assertFalse(media_storage.exists(self.orphans[1]))
+        self.assertFalse(StoredFile.objects.filter(name=self.orphans[1]).exists())
+        self.assertEqual(command.deleted, 3)
@@ -0,0 +1,104 @@
+"""
+Normalised avatar-sized copies of profile pictures.
+
+Every picture gets a square ``small`` and ``medium`` thumbnail in JPEG and
+WebP, turned upright from its EXIF orientation and saved without any
+metadata. Derivatives live beside each other under ``thumbnails/`` with
+names derived from the original, so they can be found (and removed)
+from the original's name alone.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from administration.jobs import enqueue
+from .hashing import _init_worker
+
+# Edge in pixels; avatars are shown at up to half of these on 2x screens.
+SIZES = {"small": 96, "medium": 320}
+FORMATS = {
+    "jpeg": (".jpg", {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True}),
+    "webp": (".webp", {"format": "WEBP", "quality": 80, "method": 4}),
+}
+
+
+def thumbnail_name(name, size, image_format="jpeg"):
+    stem, _ = os.path.splitext(name)
+    return f"thumbnails/{stem}_{size}{FORMATS[image_format][0]}"
+
+
+def thumbnail_names(name):
+    return [thumbnail_name(name, size, image_format) for size in SIZES for image_format in FORMATS]
+
+
+def build_thumbnails(name, storage=None):
+    """Write every derivative of the stored picture ``name``; returns their names."""
+    storage = storage or default_storage
+    with storage.open(name, "rb") as file:
+        image = Image.open(file)
+        # Decode only as much as the largest thumbnail needs (JPEG only).
+        image.draft("RGB", (max(SIZES.values()) * 2,) * 2)
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    written = []
+    for size, edge in SIZES.items():
+        square = ImageOps.fit(image, (edge, edge), Image.Resampling.LANCZOS)
+        for image_format, (_, options) in FORMATS.items():
+            variant = square
+            if has_alpha and options["format"] == "JPEG":
+                variant = Image.new("RGB", square.size, "white")
+                variant.paste(square, mask=square.getchannel("A"))
+            buffer = io.BytesIO()
+            # No exif= argument, so no metadata is written.
+            variant.save(buffer, **options)
+            target = thumbnail_name(name, size, image_format)
+            storage.delete(target)
+            written.append(storage.save(target, ContentFile(buffer.getvalue())))
+    return written
+
+
+def schedule_thumbnails(name, pixels):
+    """
+    Build the thumbnails of a just-saved picture once the transaction commits.
+
+    Pictures up to THUMBNAIL_INLINE_MAX_PIXELS take a few milliseconds and
+    are done inline; larger ones go to the job queue so the upload request
+    does not wait for them to be decoded.
+    """
+    if all(default_storage.exists(thumbnail) for thumbnail in thumbnail_names(name)):
+        # Same bytes as a stored picture, so the same (content-named) thumbnails.
+        return
+    if pixels > settings.THUMBNAIL_INLINE_MAX_PIXELS:
+        transaction.on_commit(lambda: enqueue("accounts.build_thumbnails", {"name": name}))
+    else:
+        transaction.on_commit(lambda: build_thumbnails(name))
+
+
+def _build_quietly(name):
+    try:
+        return name, build_thumbnails(name), None
+    except Exception as exc:
+        return name, [], f"{type(exc).__name__}: {exc}"
+
+
+def build_many(names, processes):
+    """Yield ``(name, written, error)`` for each picture, built across ``processes``."""
+    if processes <= 1:
+        yield from map(_build_quietly, names)
+        return
+    # Forked workers must not share the parent's database sockets.
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_worker,
+        initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", ""),),
+    ) as pool:
+        yield from pool.map(_build_quietly, names, chunksize=8)
@@ -25,8 +25,11 @@ urlpatterns = [
     path('librarian/delete/<int:pk>/', views.LibrarianDeleteView.as_view(), name='librarian_delete'),
     # Student
     path('student/list/', views.StudentListView.as_view(), name='student_list'),
+    path('student/export/', views.StudentExportView.as_view(), name='student_export'),
     path('student/create/', views.StudentCreateView.as_view(), name='student_create'),
     path('student/detail/<int:pk>/', views.StudentDetailView.as_view(), name='student_detail'),
     path('student/update/<int:pk>/', views.StudentUpdateView.as_view(), name='student_update'),
     path('student/delete/<int:pk>/', views.StudentDeleteView.as_view(), name='student_delete'),
+    # Bulk import
+    path('import/', views.PeopleImportView.as_view(), name='people_import'),
 ]
@@ -1,3 +1,7 @@
+import os
+import uuid
+
+from django.core.files.storage import storages
 from django.shortcuts import redirect
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
@@ -8,34 +12,43 @@ from django.views.generic import (
     UpdateView,
     DeleteView,
     DetailView,
+    FormView,
 )
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
 
 from accounts.decorators import role_required
+from accounts.exports import ExportView
+from accounts.pagination import KeysetPaginationMixin
+from school_management.routers import ReplicaReadsMixin
+from administration.jobs import enqueue
 from management.models import Grade
-from .models import Admin, Staff, Librarian, Student
-from .forms import AdminForm, StaffForm, LibrarianForm, StudentForm
+from .models import User, Admin, Staff, Librarian, Student
+from .forms import AdminForm, StaffForm, LibrarianForm, StudentForm, PeopleImportForm
+from .importers import PeopleImporter, read_rows
+
+
+ROLE_DASHBOARDS = {
+    User.ADMIN: "admin_dashboard",
+    User.STAFF: "staff_dashboard",
+    User.LIBRARIAN: "librarian_dashboard",
+}
 
 
 @login_required
 def user_redirect(request):
-    """Redirects users to their respective dashboards based on user class."""
-
-    if hasattr(request.user, "admin"):
-        return redirect("admin_dashboard")
-    elif hasattr(request.user, "staff"):
-        return redirect("staff_dashboard")
-    elif hasattr(request.user, "librarian"):
-        return redirect("librarian_dashboard")
-    else:
+    """Redirects users to their respective dashboards based on the stored user role."""
+
+    dashboard = ROLE_DASHBOARDS.get(request.user.role)
+    if dashboard is None:
         raise Http404("You are not registered with the system")
+    return redirect(dashboard)
 
 
 # Admin Views
 @method_decorator(role_required(allowed_roles=["admin"]), name="dispatch")
-class AdminListView(LoginRequiredMixin, ListView):
+class AdminListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Admin
     template_name = "accounts/admin_list.html"
     context_object_name = "admins"
@@ -120,7 +133,7 @@ class AdminDeleteView(LoginRequiredMixin, DeleteView):
 
 # Staff Views
 @method_decorator(role_required(allowed_roles=["admin"]), name="dispatch")
-class StaffListView(LoginRequiredMixin, ListView):
+class StaffListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Staff
     template_name = "accounts/staff_list.html"
     context_object_name = "staffs"
@@ -204,7 +217,7 @@ class StaffDeleteView(LoginRequiredMixin, DeleteView):
 @method_decorator(role_required(allowed_roles=["admin"]), name="dispatch")
 
 # Librarian Views
-class LibrarianListView(LoginRequiredMixin, ListView):
+class LibrarianListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Librarian
     template_name = "accounts/librarian_list.html"
     context_object_name = "librarians"
@@ -286,7 +299,7 @@ class LibrarianDeleteView(LoginRequiredMixin, DeleteView):
 
 
 @method_decorator(role_required(allowed_roles=["admin", "staff"]), name="dispatch")
-class StudentListView(LoginRequiredMixin, ListView):
+class StudentListView(LoginRequiredMixin, ReplicaReadsMixin, KeysetPaginationMixin, ListView):
     model = Student
     template_name = "accounts/student_list.html"
     context_object_name = "students"
@@ -307,11 +320,42 @@ class StudentListView(LoginRequiredMixin, ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["grades"] = Grade.objects.filter(student__isnull=False).distinct()
+        # The rollup already knows which grades have students; no join needed.
+        context["grades"] = Grade.objects.filter(rollup__student_count__gt=0).order_by(
+            "standard", "section"
+        )
         context["selected_grade"] = self.request.GET.get("grade")
         return context
 
 
+@method_decorator(role_required(allowed_roles=["admin", "staff"]), name="dispatch")
+class StudentExportView(LoginRequiredMixin, ExportView):
+    filename = "students"
+    columns = [
+        ("Registration ID", "registration_id"),
+        ("Username", "username"),
+        ("First Name", "first_name"),
+        ("Last Name", "last_name"),
+        ("Standard", "grade__standard"),
+        ("Section", "grade__section"),
+        ("Admission Date", "admission_date"),
+        ("Parent Name", "parent_name"),
+        ("Parent Contact", "parent_contact_number"),
+        ("Email", "email"),
+        ("Phone", "phone_number"),
+    ]
+
+    def get_queryset(self):
+        queryset = Student.objects.order_by("grade__standard", "grade__section", "username")
+        grade_id = self.request.GET.get("grade")
+        if grade_id:
+            try:
+                queryset = queryset.filter(grade_id=int(grade_id))
+            except ValueError:
+                pass
+        return queryset
+
+
 @method_decorator(role_required(allowed_roles=["admin", "staff"]), name="dispatch")
 class StudentDetailView(LoginRequiredMixin, DetailView):
     model = Student
@@ -380,3 +424,39 @@ class StudentDeleteView(LoginRequiredMixin, DeleteView):
     def delete(self, request, *args, **kwargs):
         messages.success(request, "Librarian deleted successfully.")
         return super().delete(request, *args, **kwargs)
+
+
+@method_decorator(role_required(allowed_roles=["admin"]), name="dispatch")
+class PeopleImportView(LoginRequiredMixin, FormView):
+    form_class = PeopleImportForm
+    template_name = "accounts/import_people.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["page_title"] = "Import Students / Staff"
+        return context
+
+    # Larger uploads are imported by a background worker.
+    inline_max_bytes = 256 * 1024
+
+    def form_valid(self, form):
+        upload = form.cleaned_data["file"]
+        if upload.size > self.inline_max_bytes:
+            extension = os.path.splitext(upload.name)[1].lower()
+            path = storages["imports"].save(f"{uuid.uuid4().hex}{extension}", upload)
+            job = enqueue("accounts.import_people", {"path": path, "kind": form.cleaned_data["kind"]})
+            messages.info(self.request, "The file is being imported in the background.")
+            return redirect("job_detail", pk=job.pk)
+        try:
+            report = PeopleImporter(form.cleaned_data["kind"]).run(
+                read_rows(upload.file, upload.name)
+            )
+        except ValueError as exc:
+            messages.error(self.request, str(exc))
+            return self.render_to_response(self.get_context_data(form=form))
+
+        if report.created:
+            messages.success(self.request, f"{report.created} accounts imported successfully.")
+        if report.failed:
+            messages.error(self.request, f"{report.failed} rows could not be imported.")
+        return self.render_to_response(self.get_context_data(form=form, report=report))
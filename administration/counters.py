@@ -0,0 +1,54 @@
+from django.core.cache import caches
+from django.db import connections, router
+
+from accounts.models import User
+from library.models import Book, LibraryRecord
+from management.models import Department
+
+# Invalidated by signals in whichever process made the write, so the
+# counters skip the per-process tier and live only in the shared cache.
+COUNTERS_CACHE = "shared"
+COUNTERS_CACHE_KEY = "administration:dashboard_counters"
+# Backstop for writes that bypass signals (queryset.update(), raw SQL).
+COUNTERS_TIMEOUT = 300
+
+
+def counter_querysets():
+    return {
+        "students_count": User.objects.filter(role=User.STUDENT),
+        "staff_count": User.objects.filter(role=User.STAFF),
+        "admin_count": User.objects.filter(role=User.ADMIN),
+        "librarian_count": User.objects.filter(role=User.LIBRARIAN),
+        "books_count": Book.objects.all(),
+        "departments_count": Department.objects.all(),
+        "books_to_return": LibraryRecord.objects.filter(return_date__isnull=True),
+    }
+
+
+def compute_counters():
+    """Count every dashboard figure in a single round-trip."""
+    querysets = counter_querysets()
+    connection = connections[router.db_for_read(User)]
+    columns, params = [], []
+    for name, queryset in querysets.items():
+        sql, query_params = queryset.order_by().values("pk").query.sql_with_params()
+        alias = connection.ops.quote_name(name)
+        columns.append(f"(SELECT COUNT(*) FROM ({sql}) {connection.ops.quote_name(name + '_rows')}) AS {alias}")
+        params.extend(query_params)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT " + ", ".join(columns), params)
+        return dict(zip(querysets, cursor.fetchone()))
+
+
+def get_counters():
+    cache = caches[COUNTERS_CACHE]
+    counters = cache.get(COUNTERS_CACHE_KEY)
+    if counters is None:
+        counters = compute_counters()
+        cache.set(COUNTERS_CACHE_KEY, counters, COUNTERS_TIMEOUT)
+    return counters
+
+
+def invalidate_counters(**kwargs):
+    caches[COUNTERS_CACHE].delete(COUNTERS_CACHE_KEY)
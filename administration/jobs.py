@@ -0,0 +1,235 @@
+"""
+Background jobs stored in the project database.
+
+Tasks are plain functions registered with ``@task("app.name")`` in an
+app's ``tasks.py``; they receive the Job row (for progress reports) and the
+payload as keyword arguments. ``enqueue()`` only inserts a row, so views
+return at once, and ``manage.py run_workers`` claims and runs the rows.
+"""
+import json
+import logging
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, JobSchedule
+
+logger = logging.getLogger("administration.jobs")
+
+TASKS = {}
+
+
+def task(name):
+    """Register the decorated function as the task called ``name``."""
+
+    def register(function):
+        TASKS[name] = function
+        return function
+
+    return register
+
+
+def enqueue(task_name, payload=None, run_after=None, max_attempts=3):
+    if task_name not in TASKS:
+        raise LookupError(f"Unknown task: {task_name}")
+    return Job.objects.create(
+        task=task_name,
+        payload=payload or {},
+        run_after=run_after or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+class Cron:
+    """Standard five-field cron expression (minute hour day month weekday)."""
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected five cron fields, got '{expression}'")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(field, low, high) for field, (low, high) in zip(fields, self.RANGES)
+        )
+        # 0 and 7 are both Sunday.
+        self.weekdays = {day % 7 for day in weekdays}
+        # As in cron, a restricted day and weekday match if either does.
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field, low, high):
+        values = set()
+        for part in field.split(","):
+            part, _, step = part.partition("/")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(value) for value in part.split("-"))
+            else:
+                start = int(part)
+                end = high if step else start
+            if not low <= start <= end <= high:
+                raise ValueError(f"Cron field '{field}' is outside {low}-{high}")
+            values.update(range(start, end + 1, int(step or 1)))
+        return values
+
+    def _day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = moment.isoweekday() % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment):
+        """First matching minute strictly after ``moment``, in local time."""
+        moment = timezone.localtime(moment).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError("Cron expression never matches")
+
+
+def sync_schedules():
+    """Create or update JobSchedule rows from settings.JOB_SCHEDULES."""
+    now = timezone.now()
+    for name, spec in settings.JOB_SCHEDULES.items():
+        schedule = JobSchedule.objects.filter(name=name).first() or JobSchedule(name=name)
+        if schedule.pk is None or schedule.cron != spec["cron"]:
+            schedule.next_run_at = Cron(spec["cron"]).next_after(now)
+        schedule.task = spec["task"]
+        schedule.cron = spec["cron"]
+        schedule.payload = spec.get("payload", {})
+        schedule.save()
+
+
+def enqueue_due_schedules():
+    now = timezone.now()
+    for schedule in JobSchedule.objects.filter(enabled=True, next_run_at__lte=now):
+        following = Cron(schedule.cron).next_after(now)
+        # Only the worker that moves next_run_at on enqueues; runs missed
+        # while no worker was up collapse into one.
+        moved = JobSchedule.objects.filter(pk=schedule.pk, next_run_at=schedule.next_run_at).update(
+            next_run_at=following
+        )
+        if moved:
+            enqueue(schedule.task, schedule.payload)
+
+
+def requeue_stale():
+    """Return jobs whose worker died mid-run to the queue (or fail them)."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED, last_error="Worker stopped responding.", finished_at=timezone.now()
+    )
+    stale.update(status=Job.QUEUED, locked_by="")
+
+
+def claim(worker):
+    """Mark the next runnable job as RUNNING for ``worker`` and return it."""
+    now = timezone.now()
+    using = router.db_for_write(Job)
+    runnable = Job.objects.using(using).filter(status=Job.QUEUED, run_after__lte=now).order_by("run_after", "id")
+    claimed = {"status": Job.RUNNING, "locked_by": worker, "locked_at": now, "attempts": F("attempts") + 1}
+
+    if connections[using].features.has_select_for_update_skip_locked:
+        # Concurrent workers skip each other's locked rows instead of queueing.
+        with transaction.atomic(using=using):
+            pk = runnable.select_for_update(skip_locked=True).values_list("pk", flat=True).first()
+            if pk is None:
+                return None
+            Job.objects.using(using).filter(pk=pk).update(**claimed)
+    else:
+        # SQLite has no row locks; the conditional UPDATE decides the winner.
+        for pk in runnable.values_list("pk", flat=True)[:10]:
+            if Job.objects.using(using).filter(pk=pk, status=Job.QUEUED).update(**claimed):
+                break
+        else:
+            return None
+    return Job.objects.using(using).get(pk=pk)
+
+
+def _heartbeat(mine, stop):
+    """Refresh ``locked_at`` while the job runs, so requeue_stale leaves it be."""
+    interval = max(1, settings.JOB_LOCK_TIMEOUT / 4)
+    try:
+        while not stop.wait(interval):
+            mine.filter(status=Job.RUNNING).update(locked_at=timezone.now())
+    finally:
+        # This thread's own connections only.
+        connections.close_all()
+
+
+def run_job(job, worker):
+    mine = Job.objects.filter(pk=job.pk, locked_by=worker)
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(mine, stop), name=f"heartbeat-{job.pk}", daemon=True)
+    heartbeat.start()
+    try:
+        function = TASKS.get(job.task)
+        if function is None:
+            raise LookupError(f"Unknown task: {job.task}")
+        result = function(job, **job.payload)
+    except Exception:
+        logger.exception("Job %s failed (attempt %d of %d)", job, job.attempts, job.max_attempts)
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            mine.update(
+                status=Job.QUEUED,
+                run_after=timezone.now() + timedelta(seconds=delay),
+                locked_by="",
+                last_error=error,
+            )
+        else:
+            mine.update(status=Job.FAILED, last_error=error, finished_at=timezone.now())
+        return False
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    try:
+        # Dates and decimals become strings; other objects are an error.
+        result = json.loads(json.dumps(result, cls=DjangoJSONEncoder))
+    except (TypeError, ValueError) as exc:
+        # The work is done; running it again would not help.
+        logger.error("Job %s returned a result that is not JSON: %s", job, exc)
+        mine.update(
+            status=Job.FAILED,
+            last_error=f"Task returned a result that cannot be stored as JSON: {exc}",
+            finished_at=timezone.now(),
+        )
+        return False
+    mine.update(status=Job.DONE, result=result, progress=100, finished_at=timezone.now())
+    return True
+
+
+def work(worker, stop, poll_interval=1.0, once=False):
+    """Run jobs until ``stop`` is set (or the queue is empty with ``once``)."""
+    while not stop.is_set():
+        enqueue_due_schedules()
+        requeue_stale()
+        job = claim(worker)
+        if job is None:
+            if once:
+                return
+            stop.wait(poll_interval)
+            continue
+        run_job(job, worker)
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from accounts.models import User
+
+DASHBOARDS = {
+    "admin_dashboard": User.ADMIN,
+    "librarian_dashboard": User.LIBRARIAN,
+    "staff_dashboard": User.STAFF,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the dashboards concurrently through Django's WSGI handler (a pool "
+        "of worker threads) and its ASGI handler (one event loop) and report "
+        "throughput and p50/p95 latency of each as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per dashboard and handler.")
+        parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once.")
+        parser.add_argument(
+            "--threads", type=int, default=8, help="WSGI worker threads, as in gunicorn --threads."
+        )
+        parser.add_argument(
+            "--db-latency",
+            type=float,
+            default=0,
+            metavar="MS",
+            help="Add this much network latency to every query, as seen with a remote database.",
+        )
+        parser.add_argument("--dashboards", nargs="+", default=list(DASHBOARDS), choices=DASHBOARDS)
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--fresh",
+            type=int,
+            metavar="STUDENTS",
+            help="Run in a throwaway database filled by generate_school with this many students.",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = None
+        latency = options["db_latency"] / 1000
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_delay(connection, **kwargs):
+            connection.execute_wrappers.append(delay)
+
+        try:
+            if options["fresh"]:
+                old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                call_command(
+                    "generate_school",
+                    students=options["fresh"],
+                    books=max(100, options["fresh"]),
+                    stdout=self.stdout,
+                )
+            if latency:
+                connection_created.connect(add_delay)
+                for existing in connections.all(initialized_only=True):
+                    add_delay(existing)
+
+            results = {}
+            for name in options["dashboards"]:
+                cookies = self.login(DASHBOARDS[name])
+                path = reverse(name)
+                results[name] = {
+                    "path": path,
+                    "wsgi": self.run_wsgi(path, cookies, options["requests"], options["threads"]),
+                    "asgi": asyncio.run(
+                        self.run_asgi(path, cookies, options["requests"], options["concurrency"])
+                    ),
+                }
+        finally:
+            connection_created.disconnect(add_delay)
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            "ran_at": datetime.now().isoformat(timespec="seconds"),
+            "database": connection.vendor,
+            "db_latency_ms": options["db_latency"],
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "wsgi_threads": options["threads"],
+            "dashboards": results,
+        }
+        self.print_report(results)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def login(self, role):
+        user = User.objects.filter(role=role, is_active=True).order_by("pk").first()
+        if user is None:
+            raise CommandError(f"No active {role} to log in as; run generate_school first.")
+        client = Client()
+        client.force_login(user)
+        return client.cookies
+
+    def run_wsgi(self, path, cookies, total, threads):
+        local = threading.local()
+
+        def request(_):
+            if not hasattr(local, "client"):
+                local.client = Client(raise_request_exception=False)
+                local.client.cookies = cookies
+            started = time.perf_counter()
+            status = local.client.get(path).status_code
+            return status, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            outcomes = list(pool.map(request, range(total)))
+        return self.summarise(outcomes, time.perf_counter() - started)
+
+    async def run_asgi(self, path, cookies, total, concurrency):
+        remaining = iter(range(total))
+        outcomes = []
+
+        async def worker():
+            client = AsyncClient(raise_request_exception=False)
+            client.cookies = cookies
+            for _ in remaining:
+                started = time.perf_counter()
+                status = (await client.get(path)).status_code
+                outcomes.append((status, time.perf_counter() - started))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return self.summarise(outcomes, time.perf_counter() - started)
+
+    def summarise(self, outcomes, elapsed):
+        timings = sorted(duration * 1000 for _, duration in outcomes)
+        return {
+            "statuses": dict(Counter(status for status, _ in outcomes)),
+            "requests_per_second": round(len(outcomes) / elapsed, 1),
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        }
+
+    def print_report(self, results):
+        self.stdout.write(f"{'dashboard':<22} {'handler':<8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}  statuses")
+        for name, result in results.items():
+            for handler in ("wsgi", "asgi"):
+                figures = result[handler]
+                statuses = ", ".join(f"{status} x{count}" for status, count in figures["statuses"].items())
+                self.stdout.write(
+                    f"{name:<22} {handler:<8} {figures['requests_per_second']:>8.1f} "
+                    f"{figures['p50_ms']:>8.2f} {figures['p95_ms']:>8.2f}  {statuses}"
+                )
@@ -0,0 +1,140 @@
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from accounts.models import User
+from school_management.db.pool import PooledDatabaseWrapperMixin, pool_stats
+
+from .bench_asgi import DASHBOARDS
+
+
+class Command(BaseCommand):
+    help = (
+        "Request a dashboard from many threads with the connection pool off "
+        "(a new connection per request) and on, and report requests/sec, "
+        "latency and connections opened. Point the database at a local "
+        "MySQL/MariaDB with data from generate_school."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Database alias to benchmark.")
+        parser.add_argument("--view", default="librarian_dashboard", choices=DASHBOARDS)
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent request threads.")
+        parser.add_argument(
+            "--connect-latency",
+            type=float,
+            default=0,
+            metavar="MS",
+            help="Add this much to every new connection, as a TLS handshake to a remote server would.",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        connection = connections[alias]
+        if not isinstance(connection, PooledDatabaseWrapperMixin):
+            raise CommandError(
+                f"'{alias}' uses {connection.settings_dict['ENGINE']}; set ENGINE to "
+                "school_management.db.mysql (or .sqlite3) to benchmark the pool."
+            )
+        settings_dict = connections.settings[alias]
+        saved = settings_dict.get("POOL"), settings_dict["CONN_MAX_AGE"]
+        settings_dict["POOL"] = {**(saved[0] or {}), "ENABLED": True}
+        settings_dict["CONN_MAX_AGE"] = 0
+
+        # The backend class the pool wraps; each call is one real connection.
+        mro = type(connection).__mro__
+        backend = mro[mro.index(PooledDatabaseWrapperMixin) + 1]
+        connects = []
+        connect = backend.get_new_connection
+        latency = options["connect_latency"] / 1000
+
+        def counted_connect(wrapper, conn_params):
+            connects.append(1)
+            time.sleep(latency)
+            return connect(wrapper, conn_params)
+
+        setup_test_environment()
+        try:
+            user = User.objects.using(alias).filter(role=DASHBOARDS[options["view"]], is_active=True).first()
+            if user is None:
+                raise CommandError("No user to log in as; run generate_school first.")
+            login = Client()
+            login.force_login(user)
+            path = reverse(options["view"])
+
+            results = {}
+            with mock.patch.object(backend, "get_new_connection", counted_connect):
+                for mode, enabled in (("no_pool", False), ("pool", True)):
+                    settings_dict["POOL"]["ENABLED"] = enabled
+                    connections.close_all()
+                    connects.clear()
+                    results[mode] = self.run(path, login.cookies, options["requests"], options["threads"])
+                    results[mode]["connections_opened"] = len(connects)
+            results["pool"]["pool_stats"] = pool_stats()
+        finally:
+            connections.close_all()
+            settings_dict["POOL"], settings_dict["CONN_MAX_AGE"] = saved
+            teardown_test_environment()
+
+        report = {
+            "ran_at": datetime.now().isoformat(timespec="seconds"),
+            "database": f"{connection.vendor} ({connection.settings_dict['ENGINE']})",
+            "path": path,
+            "requests": options["requests"],
+            "threads": options["threads"],
+            "connect_latency_ms": options["connect_latency"],
+            "results": results,
+        }
+        self.stdout.write(f"{'mode':<8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'connects':>9}  statuses")
+        for mode, figures in results.items():
+            statuses = ", ".join(f"{status} x{count}" for status, count in figures["statuses"].items())
+            self.stdout.write(
+                f"{mode:<8} {figures['requests_per_second']:>8.1f} {figures['p50_ms']:>8.2f} "
+                f"{figures['p95_ms']:>8.2f} {figures['connections_opened']:>9}  {statuses}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def run(self, path, cookies, total, threads):
+        local = threading.local()
+
+        def request(_):
+            if not hasattr(local, "client"):
+                local.client = Client(raise_request_exception=False)
+                local.client.cookies = cookies
+            started = time.perf_counter()
+            status = local.client.get(path).status_code
+            # The test client skips request_finished handling; a real server
+            # closes (or returns to the pool) the connection here.
+            close_old_connections()
+            return status, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            outcomes = list(pool.map(request, range(total)))
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(duration * 1000 for _, duration in outcomes)
+        statuses = {}
+        for status, _ in outcomes:
+            statuses[status] = statuses.get(status, 0) + 1
+        return {
+            "statuses": statuses,
+            "requests_per_second": round(len(outcomes) / elapsed, 1),
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        }
@@ -0,0 +1,115 @@
+import copy
+import json
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from administration.models import Job
+
+
+def profiles():
+    from school_management.settings import sqlite
+
+    tuned = copy.deepcopy(sqlite.DATABASES[DEFAULT_DB_ALIAS])
+    tuned["POOL"] = {"ENABLED": False}
+    return {
+        # What settings/base.py gives: rollback journal, deferred
+        # transactions, the sqlite3 module's 5 second timeout, no retries.
+        "before": {"ENGINE": "django.db.backends.sqlite3"},
+        "after": tuned,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent read-then-write transactions against a scratch SQLite "
+        "file with Django's default SQLite settings and with the tuned profile "
+        "(settings/sqlite.py), and report commits/sec, lock errors and latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=16, help="Concurrent writers.")
+        parser.add_argument("--transactions", type=int, default=200, help="Transactions per worker.")
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+
+    def handle(self, *args, **options):
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for name, config in profiles().items():
+                alias = f"bench_{name}"
+                config = {**config, "NAME": str(Path(directory) / f"{name}.sqlite3")}
+                connections.settings[alias] = connections.configure_settings(
+                    {DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS], alias: config}
+                )[alias]
+                try:
+                    with connections[alias].schema_editor() as editor:
+                        editor.create_model(Job)
+                    results[name] = self.run(alias, options["workers"], options["transactions"])
+                finally:
+                    connections[alias].close()
+                    del connections.settings[alias]
+
+        self.stdout.write(f"{'profile':<8} {'commits/s':>10} {'committed':>10} {'failed':>7} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, figures in results.items():
+            self.stdout.write(
+                f"{name:<8} {figures['commits_per_second']:>10.1f} {figures['committed']:>10} "
+                f"{figures['failed']:>7} {figures['p50_ms']:>8.2f} {figures['p95_ms']:>8.2f}"
+            )
+        if options["output"]:
+            report = {
+                "ran_at": datetime.now().isoformat(timespec="seconds"),
+                "workers": options["workers"],
+                "transactions_per_worker": options["transactions"],
+                "profiles": results,
+            }
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def run(self, alias, workers, transactions):
+        timings, errors = [], []
+        lock = threading.Lock()
+
+        def worker(number):
+            jobs = Job.objects.using(alias)
+            mine, failed = [], []
+            for sequence in range(transactions):
+                started = time.perf_counter()
+                try:
+                    # Read, then write in the same transaction, like a desk
+                    # checking a book's copies before lending it.
+                    with transaction.atomic(using=alias):
+                        queued = jobs.filter(status=Job.QUEUED).count()
+                        jobs.create(task="bench", payload={"worker": number, "seen": queued, "n": sequence})
+                except OperationalError as exc:
+                    failed.append(str(exc))
+                    continue
+                mine.append(time.perf_counter() - started)
+            connections[alias].close()
+            with lock:
+                timings.extend(mine)
+                errors.extend(failed)
+
+        threads = [threading.Thread(target=worker, args=(number,)) for number in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(duration * 1000 for duration in timings)
+        return {
+            "committed": len(timings),
+            "failed": len(errors),
+            "errors": sorted(set(errors)),
+            "commits_per_second": round(len(timings) / elapsed, 1),
+            "p50_ms": round(statistics.median(timings), 2) if timings else None,
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2) if timings else None,
+        }
@@ -0,0 +1,176 @@
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.views.generic.edit import DeletionMixin
+
+from accounts.models import User
+from school_management.middleware import QueryStats
+
+APPS = ["accounts", "library", "management", "administration"]
+# Tried in this order; each URL is timed as the first role that gets a 200.
+ROLES = [User.ADMIN, User.LIBRARIAN, User.STAFF, User.STUDENT]
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every GET URL of the school apps through the test client and "
+        "report p50/p95 latency, query counts and peak memory as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="Timed requests per URL.")
+        parser.add_argument("--apps", nargs="+", default=APPS, help="Apps whose URLs are benchmarked.")
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--compare", help="Earlier results JSON to show the p50 change against.")
+        parser.add_argument(
+            "--fresh",
+            type=int,
+            metavar="STUDENTS",
+            help="Run in a throwaway database filled by generate_school with this many students.",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = None
+        try:
+            if options["fresh"]:
+                old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                call_command(
+                    "generate_school",
+                    students=options["fresh"],
+                    books=max(100, options["fresh"]),
+                    stdout=self.stdout,
+                )
+            clients = self.clients()
+            if not clients:
+                raise CommandError("No users to log in as; run generate_school first.")
+            results = {
+                name: self.measure(path, clients, options["repeat"])
+                for name, path in self.urls(options["apps"])
+            }
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            "ran_at": datetime.now().isoformat(timespec="seconds"),
+            "database": connection.vendor,
+            "repeat": options["repeat"],
+            "urls": results,
+        }
+        previous = self.load(options["compare"]) if options["compare"] else {}
+        self.print_report(results, previous)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def clients(self):
+        clients = {}
+        for role in ROLES:
+            user = User.objects.filter(role=role, is_active=True).order_by("pk").first()
+            if user is not None:
+                # Broken views are reported as skipped instead of aborting the run.
+                client = Client(raise_request_exception=False)
+                client.force_login(user)
+                clients[role] = client
+        return clients
+
+    def urls(self, apps):
+        """(name, path) for every pattern of ``apps``, filling ``pk`` with a real row."""
+        for resolver in get_resolver().url_patterns:
+            if not isinstance(resolver, URLResolver):
+                continue
+            module = getattr(resolver.urlconf_module, "__name__", "")
+            if module.split(".")[0] not in apps:
+                continue
+            for pattern in resolver.url_patterns:
+                if not isinstance(pattern, URLPattern) or not pattern.name:
+                    continue
+                view_class = getattr(pattern.callback, "view_class", None)
+                if view_class and issubclass(view_class, DeletionMixin):
+                    # Some delete views act on GET; never run them here.
+                    continue
+                kwargs = {}
+                if "pk" in pattern.pattern.converters:
+                    model = getattr(view_class, "model", None)
+                    pk = model and model.objects.order_by("pk").values_list("pk", flat=True).first()
+                    if pk is None:
+                        self.stderr.write(f"Skipping {pattern.name}: no rows to request.")
+                        continue
+                    kwargs["pk"] = pk
+                yield pattern.name, reverse(pattern.name, kwargs=kwargs)
+
+    def measure(self, path, clients, repeat):
+        role, statuses = None, {}
+        for candidate, client in clients.items():
+            statuses[candidate] = client.get(path).status_code
+            if statuses[candidate] == 200:
+                role = candidate
+                break
+        if role is None:
+            return {"path": path, "statuses": statuses, "skipped": True}
+
+        client = clients[role]
+        timings, stats = [], None
+        for _ in range(repeat):
+            stats = QueryStats()
+            with connection.execute_wrapper(stats):
+                started = time.perf_counter()
+                client.get(path)
+                timings.append((time.perf_counter() - started) * 1000)
+
+        tracemalloc.start()
+        client.get(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings.sort()
+        return {
+            "path": path,
+            "role": role,
+            "status": 200,
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+            "queries": stats.count,
+            "repeated_queries": sum(count - 1 for _, count in stats.duplicates()),
+            "db_ms": round(stats.duration * 1000, 2),
+            "peak_kb": round(peak / 1024, 1),
+        }
+
+    def load(self, path):
+        try:
+            with open(path) as file:
+                return json.load(file)["urls"]
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+
+    def print_report(self, results, previous):
+        self.stdout.write(
+            f"{'url':<28} {'role':<10} {'p50 ms':>8} {'p95 ms':>8} {'queries':>8} {'repeat':>7} {'peak KB':>9}"
+        )
+        for name, result in results.items():
+            if result.get("skipped"):
+                statuses = ", ".join(f"{role} {status}" for role, status in result["statuses"].items())
+                self.stdout.write(f"{name:<28} skipped ({statuses})")
+                continue
+            line = (
+                f"{name:<28} {result['role']:<10} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                f"{result['queries']:>8} {result['repeated_queries']:>7} {result['peak_kb']:>9.1f}"
+            )
+            before = previous.get(name, {}).get("p50_ms")
+            if before:
+                change = (result["p50_ms"] - before) / before * 100
+                style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+                line += " " + style(f"{change:+.0f}%")
+            self.stdout.write(line)
@@ -0,0 +1,260 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.caching import bump_version
+from accounts.importers import PeopleImporter
+from accounts.models import Admin, Librarian, RegistrationSequence, Staff, Student, User
+from administration.counters import invalidate_counters
+from library.circulation import record_status
+from library.models import Book, BookTally, DueDateTally, LibraryRecord
+from management.models import Department, FeeRecord, Grade, GradeRollup
+
+DEPARTMENTS = [
+    "Mathematics", "Science", "English", "Social Studies", "Languages",
+    "Computer Science", "Physical Education", "Arts", "Music", "Commerce",
+]
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Meera", "Kabir", "Anaya", "Rohan", "Sara", "Vivaan", "Nila"]
+LAST_NAMES = ["Nair", "Sharma", "Menon", "Iyer", "Khan", "Das", "Pillai", "Reddy", "Joseph", "Rao"]
+LOAN_DAYS = 14
+
+
+class Command(BaseCommand):
+    help = (
+        "Create a synthetic school in bulk: grades, departments, staff, "
+        "students, books and years of library and fee records."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--standards", type=int, default=12)
+        parser.add_argument("--sections", type=int, default=4, help="Sections per standard.")
+        parser.add_argument("--staff", type=int, default=120)
+        parser.add_argument("--librarians", type=int, default=3)
+        parser.add_argument("--students", type=int, default=5000)
+        parser.add_argument("--books", type=int, default=5000)
+        parser.add_argument("--years", type=int, default=3, help="Years of library and fee history.")
+        parser.add_argument("--loans-per-year", type=int, default=12, help="Loans per student per year.")
+        parser.add_argument("--fees-per-year", type=int, default=4, help="Fee records per student per year.")
+        parser.add_argument("--prefix", default="gen", help="Username prefix of the generated accounts.")
+        parser.add_argument("--password", default="password", help="Password of every generated account.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.prefix = options["prefix"]
+        if User.objects.filter(username__startswith=f"{self.prefix}-").exists():
+            raise CommandError(f"Accounts prefixed '{self.prefix}-' already exist; pick another --prefix.")
+        self.random = random.Random(options["seed"])
+        self.today = date.today()
+        self.start = self.today - timedelta(days=365 * options["years"])
+        # Hashing once keeps generation fast; every account shares the password.
+        self.password = make_password(options["password"])
+
+        started = time.monotonic()
+        departments = self.step("departments", self.create_departments)
+        grades = self.step("grades", self.create_grades)
+        staff = self.step("staff", self.create_staff, departments)
+        self.step("librarians and admin", self.create_desk_accounts, departments)
+        self.step("grade teachers", self.assign_teachers, grades, staff)
+        students = self.step("students", self.create_students, grades)
+        books = self.step("books", self.create_books)
+        self.step("library records", self.create_records, students, books)
+        self.step("fee records", self.create_fees, students)
+        self.step("rollups", self.rebuild_rollups)
+        invalidate_counters()
+        bump_version(Book, Department, Grade, Staff, Student)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated school in {time.monotonic() - started:.1f}s. "
+                f"Log in as {self.prefix}-admin / {options['password']}."
+            )
+        )
+
+    def step(self, label, function, *args):
+        started = time.monotonic()
+        result = function(*args)
+        count = len(result) if isinstance(result, list) else result
+        count = f"{count} " if count is not None else ""
+        self.stdout.write(f"  {count}{label} ({time.monotonic() - started:.1f}s)")
+        return result
+
+    def name(self):
+        return self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+
+    def create_departments(self):
+        names = DEPARTMENTS[: max(1, self.options["staff"] // 10)]
+        Department.objects.bulk_create([Department(name=name) for name in names], ignore_conflicts=True)
+        return list(Department.objects.filter(name__in=names))
+
+    def create_grades(self):
+        Grade.objects.bulk_create(
+            [
+                Grade(standard=standard, section=chr(ord("A") + section))
+                for standard in range(1, self.options["standards"] + 1)
+                for section in range(self.options["sections"])
+            ],
+            ignore_conflicts=True,
+        )
+        return list(
+            Grade.objects.filter(
+                standard__lte=self.options["standards"],
+                section__in=[chr(ord("A") + section) for section in range(self.options["sections"])],
+            ).order_by("standard", "section")
+        )
+
+    def create_people(self, kind, people):
+        """Insert accounts with the bulk importer's batched MTI insert."""
+        importer = PeopleImporter(kind)
+        batch_size = self.options["batch_size"]
+        for start in range(0, len(people), batch_size):
+            chunk = people[start:start + batch_size]
+            with transaction.atomic():
+                registration_ids = RegistrationSequence.reserve(importer.prefix, count=len(chunk))
+                for person, registration_id in zip(chunk, registration_ids):
+                    person.registration_id = registration_id
+                importer.insert(chunk)
+        return people
+
+    def create_staff(self, departments):
+        people = []
+        for index in range(self.options["staff"]):
+            first_name, last_name = self.name()
+            people.append(
+                Staff(
+                    username=f"{self.prefix}-staff-{index}",
+                    first_name=first_name,
+                    last_name=last_name,
+                    password=self.password,
+                    role=User.STAFF,
+                    department=departments[index % len(departments)],
+                    designation="Teacher",
+                    qualification="B.Ed",
+                    joining_date=self.start,
+                )
+            )
+        return self.create_people(User.STAFF, people)
+
+    def create_desk_accounts(self, departments):
+        Admin.objects.create(
+            username=f"{self.prefix}-admin",
+            password=self.password,
+            department=departments[0],
+            is_staff=True,
+        )
+        for index in range(self.options["librarians"]):
+            Librarian.objects.create(
+                username=f"{self.prefix}-librarian-{index}",
+                password=self.password,
+                qualification="B.Lib",
+            )
+
+    def assign_teachers(self, grades, staff):
+        if not staff:
+            return
+        for index, grade in enumerate(grades):
+            grade.in_charge_id = staff[index % len(staff)].pk
+        Grade.objects.bulk_update(grades, ["in_charge"])
+
+    def create_students(self, grades):
+        people = []
+        for index in range(self.options["students"]):
+            first_name, last_name = self.name()
+            people.append(
+                Student(
+                    username=f"{self.prefix}-student-{index}",
+                    first_name=first_name,
+                    last_name=last_name,
+                    password=self.password,
+                    role=User.STUDENT,
+                    grade=grades[index % len(grades)],
+                    admission_date=self.start,
+                    parent_name=f"{self.random.choice(FIRST_NAMES)} {last_name}",
+                    parent_contact_number=f"9{self.random.randint(100000000, 999999999)}",
+                )
+            )
+        return self.create_people(User.STUDENT, people)
+
+    def create_books(self):
+        books = [
+            Book(title=f"Book {index}", author=f"{' '.join(self.name())}", total_copies=copies, available_copies=copies)
+            for index, copies in ((index, self.random.randint(1, 10)) for index in range(self.options["books"]))
+        ]
+        return Book.objects.bulk_create(books, batch_size=self.options["batch_size"])
+
+    def create_records(self, students, books):
+        out = {book.pk: 0 for book in books}
+        copies = {book.pk: book.total_copies for book in books}
+        days = (self.today - self.start).days
+
+        def records():
+            for student in students:
+                for _ in range(self.options["loans_per_year"] * self.options["years"]):
+                    book = self.random.choice(books)
+                    borrowed = self.start + timedelta(days=self.random.randint(0, days))
+                    due = borrowed + timedelta(days=LOAN_DAYS)
+                    returned = borrowed + timedelta(days=self.random.randint(1, LOAN_DAYS + 7))
+                    # Recent loans may still be out, as long as copies remain.
+                    if returned > self.today and out[book.pk] < copies[book.pk]:
+                        returned = None
+                        out[book.pk] += 1
+                    else:
+                        returned = min(returned, self.today)
+                    yield LibraryRecord(
+                        grade_id=student.grade_id,
+                        student_id=student.pk,
+                        book_id=book.pk,
+                        borrowed_date=borrowed,
+                        due_date=due,
+                        return_date=returned,
+                        status=record_status(due, returned, self.today),
+                    )
+
+        count = self.bulk_insert(LibraryRecord, records())
+        for book in books:
+            book.available_copies = book.total_copies - out[book.pk]
+        Book.objects.bulk_update(books, ["available_copies"], batch_size=self.options["batch_size"])
+        return count
+
+    def create_fees(self, students):
+        interval = 365 // max(1, self.options["fees_per_year"])
+
+        def fees():
+            for student in students:
+                amount = Decimal(1000 + 100 * student.grade.standard)
+                due = self.start + timedelta(days=self.random.randint(0, interval))
+                while due <= self.today + timedelta(days=interval):
+                    paid = due < self.today - timedelta(days=60) or self.random.random() < 0.5
+                    yield FeeRecord(
+                        grade_id=student.grade_id,
+                        student_id=student.pk,
+                        amount=amount,
+                        due_date=due,
+                        payment_date=due - timedelta(days=self.random.randint(0, 10)) if paid else None,
+                        status="PAID" if paid else "PENDING",
+                    )
+                    due += timedelta(days=interval)
+
+        return self.bulk_insert(FeeRecord, fees())
+
+    def bulk_insert(self, model, rows):
+        batch_size = self.options["batch_size"]
+        batch, count = [], 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                count += len(model.objects.bulk_create(batch))
+                batch = []
+        if batch:
+            count += len(model.objects.bulk_create(batch))
+        return count
+
+    def rebuild_rollups(self):
+        # The bulk inserts above bypass the circulation service and signals.
+        for model in (DueDateTally, BookTally, GradeRollup):
+            model.rebuild()
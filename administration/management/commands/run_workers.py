@@ -0,0 +1,71 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from administration.jobs import sync_schedules, work
+
+
+def _worker_main(name, stop, poll_interval, once):
+    import django
+
+    django.setup()
+    # The parent handles Ctrl-C and tells workers to finish their current job.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    try:
+        work(name, stop, poll_interval, once)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Run background job workers, including cron-style schedules."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes to start.")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls when idle.")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        sync_schedules()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        processes = max(1, options["processes"])
+
+        if processes == 1:
+            stop = threading.Event()
+            signal.signal(signal.SIGTERM, lambda *args: stop.set())
+            self.stdout.write(f"Worker {prefix} started.")
+            try:
+                work(prefix, stop, options["poll_interval"], options["once"])
+            except KeyboardInterrupt:
+                pass
+            return
+
+        stop = multiprocessing.Event()
+        # Forked children must not share the parent's database connections.
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(
+                target=_worker_main,
+                args=(f"{prefix}/{index}", stop, options["poll_interval"], options["once"]),
+                daemon=False,
+            )
+            for index in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        self.stdout.write(f"Started {processes} workers ({prefix}).")
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+        try:
+            for process in workers:
+                process.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers after their current jobs...")
+            stop.set()
+            for process in workers:
+                process.join()
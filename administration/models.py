@@ -0,0 +1,70 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A unit of background work, claimed and run by ``run_workers``."""
+
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    progress = models.PositiveSmallIntegerField(null=True, blank=True)
+    progress_message = models.CharField(max_length=200, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "run_after", "id"], name="job_claim_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+
+    def set_progress(self, percent=None, message=""):
+        """
+        Report progress from inside a running task.
+
+        Also renews the worker's lock; returns False if the job is no longer
+        this worker's (it was requeued as stale and claimed by another).
+        """
+        self.progress = percent
+        self.progress_message = message[:200]
+        return bool(
+            Job.objects.filter(pk=self.pk, status=Job.RUNNING, locked_by=self.locked_by).update(
+                progress=percent, progress_message=self.progress_message, locked_at=timezone.now()
+            )
+        )
+
+
+class JobSchedule(models.Model):
+    """Enqueues ``task`` whenever the cron expression comes due."""
+
+    name = models.CharField(max_length=100, unique=True)
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    cron = models.CharField(max_length=100, help_text="minute hour day-of-month month day-of-week")
+    next_run_at = models.DateTimeField()
+    enabled = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.cron})"
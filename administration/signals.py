@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+
+from accounts.models import Admin, Librarian, Staff, Student
+from library.models import Book, LibraryRecord
+from management.models import Department
+from .counters import invalidate_counters
+
+COUNTED_MODELS = [Student, Staff, Admin, Librarian, Book, Department, LibraryRecord]
+
+for model in COUNTED_MODELS:
+    post_save.connect(invalidate_counters, sender=model, dispatch_uid=f"counters_save_{model.__name__}")
+    post_delete.connect(invalidate_counters, sender=model, dispatch_uid=f"counters_delete_{model.__name__}")
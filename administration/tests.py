@@ -1,3 +1,173 @@
-from django.test import TestCase
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Admin, Librarian
+from .counters import get_counters
+
+from .jobs import Cron, claim, enqueue, requeue_stale, run_job, task
+from .models import Job
+
+
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "shared"},
+}
+
+
+def local(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+@task("tests.echo")
+def echo_task(job, value=None):
+    return {"value": value, "when": timezone.localdate(), "amount": Decimal("1.50")}
+
+
+@task("tests.fail")
+def fail_task(job):
+    raise RuntimeError("boom")
+
+
+@task("tests.unstorable")
+def unstorable_task(job):
+    return {"value": object()}
+
+
+@task("tests.slow")
+def slow_task(job, seconds):
+    time.sleep(seconds)
+    # Any other worker would take this job over now if the lock had lapsed.
+    requeue_stale()
+    return Job.objects.get(pk=job.pk).status
+
+
+class CronTests(TestCase):
+    def test_every_hour_at_five_past(self):
+        cron = Cron("5 * * * *")
+        self.assertEqual(cron.next_after(local(2026, 1, 1, 10, 4)), local(2026, 1, 1, 10, 5))
+        # Strictly after: a due minute moves on to the next hour.
+        self.assertEqual(cron.next_after(local(2026, 1, 1, 10, 5)), local(2026, 1, 1, 11, 5))
+
+    def test_rolls_over_day_month_and_year(self):
+        cron = Cron("30 2 * * *")
+        self.assertEqual(cron.next_after(local(2026, 12, 31, 3, 0)), local(2027, 1, 1, 2, 30))
+
+    def test_ranges_steps_and_lists(self):
+        cron = Cron("*/15 9-17 * * 1-5")
+        # Friday 17:50 -> Monday 09:00.
+        self.assertEqual(cron.next_after(local(2026, 10, 16, 17, 50)), local(2026, 10, 19, 9, 0))
+        self.assertEqual(Cron("0 0 1,15 * *").next_after(local(2026, 2, 2, 0, 0)), local(2026, 2, 15, 0, 0))
+
+    def test_day_and_weekday_match_either(self):
+        # The 13th, or any Friday.
+        cron = Cron("0 12 13 * 5")
+        self.assertEqual(cron.next_after(local(2026, 10, 10, 0, 0)), local(2026, 10, 13, 12, 0))
+        self.assertEqual(cron.next_after(local(2026, 10, 13, 13, 0)), local(2026, 10, 16, 12, 0))
+
+    def test_sunday_is_zero_or_seven(self):
+        self.assertEqual(Cron("0 0 * * 7").weekdays, {0})
+        self.assertEqual(Cron("0 0 * * 0").next_after(local(2026, 10, 18, 0, 0)), local(2026, 10, 25, 0, 0))
+
+    def test_invalid_expressions(self):
+        for expression in ("* * * *", "60 * * * *", "* * 0 * *", "5-1 * * * *"):
+            with self.subTest(expression=expression), self.assertRaises(ValueError):
+                Cron(expression)
+
+
+@override_settings(JOB_RETRY_DELAY=30)
+class RunJobTests(TestCase):
+    def test_claim_takes_the_oldest_runnable_job_once(self):
+        later = enqueue("tests.echo", run_after=timezone.now() + timedelta(hours=1))
+        first = enqueue("tests.echo", {"value": 1})
+        second = enqueue("tests.echo", {"value": 2})
+
+        self.assertEqual(claim("worker-a").pk, first.pk)
+        self.assertEqual(claim("worker-b").pk, second.pk)
+        self.assertIsNone(claim("worker-c"))
+
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.locked_by, first.attempts), (Job.RUNNING, "worker-a", 1))
+        later.refresh_from_db()
+        self.assertEqual(later.status, Job.QUEUED)
+
+    def test_result_is_stored_as_json(self):
+        enqueue("tests.echo", {"value": "x"})
+        job = claim("worker")
+        self.assertTrue(run_job(job, "worker"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.result, {"value": "x", "when": timezone.localdate().isoformat(), "amount": "1.50"})
+
+    def test_unstorable_result_fails_without_retry(self):
+        enqueue("tests.unstorable")
+        job = claim("worker")
+        with self.assertLogs("administration.jobs", "ERROR"):
+            self.assertFalse(run_job(job, "worker"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("JSON", job.last_error)
+
+    def test_failures_back_off_then_give_up(self):
+        enqueue("tests.fail", max_attempts=3)
+        for attempt, delay in ((1, 30), (2, 60)):
+            job = claim("worker")
+            before = timezone.now()
+            with self.assertLogs("administration.jobs", "ERROR"):
+                self.assertFalse(run_job(job, "worker"))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts, job.locked_by), (Job.QUEUED, attempt, ""))
+            self.assertIn("RuntimeError: boom", job.last_error)
+            self.assertAlmostEqual((job.run_after - before).total_seconds(), delay, delta=5)
+            # Not runnable until the back-off has passed.
+            self.assertIsNone(claim("worker"))
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+        job = claim("worker")
+        with self.assertLogs("administration.jobs", "ERROR"):
+            self.assertFalse(run_job(job, "worker"))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 3))
+
+    def test_set_progress_renews_only_its_own_lock(self):
+        enqueue("tests.echo")
+        job = claim("worker")
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(days=1))
+        self.assertTrue(job.set_progress(50, "halfway"))
+        requeue_stale()
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.RUNNING)
+
+        Job.objects.filter(pk=job.pk).update(locked_by="someone-else")
+        self.assertFalse(job.set_progress(60))
+        self.assertEqual(Job.objects.get(pk=job.pk).progress, 50)
+
+
+class HeartbeatTests(TransactionTestCase):
+    @override_settings(JOB_LOCK_TIMEOUT=1)
+    def test_long_job_is_not_requeued_while_it_runs(self):
+        enqueue("tests.slow", {"seconds": 2.5})
+        job = claim("worker")
+        self.assertTrue(run_job(job, "worker"))
+        job.refresh_from_db()
+        self.assertEqual(job.result, Job.RUNNING)
+        self.assertEqual(job.status, Job.DONE)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AdminDashboardTests(TestCase):
+    def test_counters_are_served(self):
+        self.client.force_login(Admin.objects.create(username="head"))
+        response = self.client.get(reverse("admin_dashboard"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["admin_count"], 1)
+
+    def test_counters_follow_writes(self):
+        self.assertEqual(get_counters()["librarian_count"], 0)
+        with self.assertNumQueries(0):
+            get_counters()
+        Librarian.objects.create(username="books")
+        self.assertEqual(get_counters()["librarian_count"], 1)
@@ -4,5 +4,7 @@ from . import views
 
 
 urlpatterns = [
-    path('dashboard/', views.AdminDashboard.as_view(), name='admin_dashboard'),
+    path('dashboard/', views.admin_dashboard, name='admin_dashboard'),
+    path('metrics/db/', views.db_metrics, name='db_metrics'),
+    path('jobs/<int:pk>/', views.JobDetailView.as_view(), name='job_detail'),
 ]
@@ -1,23 +1,54 @@
-from django.views.generic import TemplateView
+import os
+
+from django.http import JsonResponse
+from django.template.response import TemplateResponse
+from django.views.generic import DetailView
 from django.utils.decorators import method_decorator
 
 from accounts.decorators import role_required
-from accounts.models import Student, Staff, Admin, Librarian
-from library.models import Book, LibraryRecord
-from management.models import Department
+from school_management.db.pool import pool_stats
+from school_management.routers import reads_from_replica
+from .counters import get_counters
+from .models import Job
+
+@role_required(allowed_roles=['admin'])
+@reads_from_replica
+def admin_dashboard(request):
+    # Deliberately sync: every figure comes from one cached single-query
+    # read (see counters.py), so there is nothing to run side by side.
+    context = {'page_title': "Admin Dashboard", **get_counters()}
+    return TemplateResponse(request, "admin/admin_dashboard.html", context)
+
+
+@role_required(allowed_roles=['admin'])
+def db_metrics(request):
+    """Connection pool figures of the process that serves the request."""
+    return JsonResponse({'pid': os.getpid(), 'pools': pool_stats()})
+
 
 @method_decorator(role_required(allowed_roles=['admin']), name='dispatch')
-class AdminDashboard(TemplateView):
-    template_name = "admin/admin_dashboard.html"
+class JobDetailView(DetailView):
+    """Progress of a background job; polled as JSON with ?format=json."""
+
+    model = Job
+    template_name = "admin/job_detail.html"
+    context_object_name = "job"
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get("format") == "json":
+            job = self.object
+            return JsonResponse(
+                {
+                    "status": job.status,
+                    "progress": job.progress,
+                    "message": job.progress_message,
+                    "attempts": job.attempts,
+                    "result": job.result,
+                }
+            )
+        return super().render_to_response(context, **response_kwargs)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['page_title'] = "Admin Dashboard"
-        context['students_count'] = Student.objects.count()
-        context['staff_count'] = Staff.objects.count()
-        context['books_to_returnadmin_count'] = Admin.objects.count()
-        context['librarian_count'] = Librarian.objects.count()
-        context['books_count'] = Book.objects.count()
-        context['departments_count'] = Department.objects.count()
-        context[''] = LibraryRecord.objects.filter(status="BORROWED").count()
+        context['page_title'] = "Background Job"
         return context
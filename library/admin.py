@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import LibraryRecord, Book
+from .models import LibraryRecord, Book, OverdueSweep
 
 admin.site.register(LibraryRecord)
 admin.site.register(Book)
+admin.site.register(OverdueSweep)
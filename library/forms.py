@@ -33,6 +33,8 @@ class LibraryRecordForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # Student labels include the grade, so fetch it in the same query.
+        self.fields["student"].queryset = Student.objects.select_related("grade")
         if self.instance and not self.instance.pk:
             self.fields.pop('return_date', None)
         else:
@@ -0,0 +1,113 @@
+import threading
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from accounts.models import Student
+from library import circulation
+from library.models import Book, LibraryRecord
+from management.models import Grade
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark concurrent checkouts of one book against the configured "
+        "database and verify that no copy is oversold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=32, help="Parallel desk clients.")
+        parser.add_argument("--copies", type=int, default=200, help="Copies of the contested book.")
+        parser.add_argument(
+            "--attempts", type=int, default=20, help="Checkout attempts per client."
+        )
+        parser.add_argument(
+            "--wal",
+            action="store_true",
+            help="Switch a SQLite database to WAL journaling before the run.",
+        )
+
+    def handle(self, *args, **options):
+        if options["wal"]:
+            if connection.vendor != "sqlite":
+                raise CommandError("--wal only applies to SQLite databases.")
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode=WAL")
+
+        grade, book, students = self.setup(options)
+        results = {"ok": 0, "sold_out": 0, "errors": 0}
+        lock = threading.Lock()
+        due_date = date.today() + timedelta(days=14)
+
+        def client(student):
+            counts = {"ok": 0, "sold_out": 0, "errors": 0}
+            try:
+                for _ in range(options["attempts"]):
+                    record = LibraryRecord(grade=grade, student=student, book=book, due_date=due_date)
+                    try:
+                        circulation.checkout(record)
+                        counts["ok"] += 1
+                    except circulation.NoCopiesAvailable:
+                        counts["sold_out"] += 1
+                    except OperationalError:
+                        counts["errors"] += 1
+            finally:
+                connections.close_all()
+                with lock:
+                    for key, value in counts.items():
+                        results[key] += value
+
+        threads = [threading.Thread(target=client, args=(student,)) for student in students]
+        try:
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+            book.refresh_from_db()
+            issued = LibraryRecord.objects.filter(book=book).count()
+        finally:
+            self.teardown(grade, book, students)
+
+        attempts = options["clients"] * options["attempts"]
+        self.stdout.write(
+            f"{connection.vendor}: {options['clients']} clients, {attempts} attempts "
+            f"in {elapsed:.2f}s ({attempts / elapsed:.0f} checkouts/s)"
+        )
+        self.stdout.write(
+            f"issued={results['ok']} sold_out={results['sold_out']} "
+            f"lock_errors={results['errors']} available_copies={book.available_copies}"
+        )
+        if issued != results["ok"] or book.available_copies != options["copies"] - issued:
+            raise CommandError(f"Inventory drifted: {issued} records for {results['ok']} checkouts.")
+        self.stdout.write(self.style.SUCCESS("Inventory consistent."))
+
+    def setup(self, options):
+        grade = Grade.objects.create(standard=0, section=f"bench{int(time.time()) % 100000}")
+        book = Book.objects.create(
+            title="Circulation benchmark",
+            author="bench",
+            total_copies=options["copies"],
+            available_copies=options["copies"],
+        )
+        students = [
+            Student.objects.create(
+                username=f"bench-{grade.pk}-{index}",
+                grade=grade,
+                admission_date=date.today(),
+                parent_name="bench",
+                parent_contact_number="0",
+            )
+            for index in range(options["clients"])
+        ]
+        return grade, book, students
+
+    def teardown(self, grade, book, students):
+        LibraryRecord.objects.filter(book=book).delete()
+        book.delete()
+        Student.objects.filter(pk__in=[student.pk for student in students]).delete()
+        grade.delete()
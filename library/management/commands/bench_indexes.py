@@ -0,0 +1,167 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from accounts.models import Student
+from library.models import Book, LibraryRecord
+from management.models import FeeRecord, Grade
+
+INDEXED_MODELS = [LibraryRecord, FeeRecord]
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a synthetic dataset in a throwaway test database and compare "
+        "query plans and latencies of the list/report access paths with and "
+        "without the composite indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Library records to generate.")
+        parser.add_argument("--fee-rows", type=int, default=None, help="Fee records (default rows / 2).")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query.")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            random.seed(options["seed"])
+            self.populate(options["rows"], options["fee_rows"] or options["rows"] // 2)
+            queries = self.queries()
+
+            self.set_indexes(False)
+            before = self.measure(queries, options["repeat"])
+            self.set_indexes(True)
+            after = self.measure(queries, options["repeat"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        for name in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for label, result in (("without indexes", before[name]), ("with indexes", after[name])):
+                self.stdout.write(f"  {label}: p50 {result['p50']:.2f}ms  p95 {result['p95']:.2f}ms")
+                for line in result["plan"].splitlines():
+                    self.stdout.write(f"      {line}")
+
+    def populate(self, rows, fee_rows):
+        self.stdout.write(f"Generating {rows} library records and {fee_rows} fee records...")
+        grades = Grade.objects.bulk_create(
+            [Grade(standard=standard, section=section) for standard in range(1, 13) for section in "ABCD"]
+        )
+        students = [
+            Student.objects.create(
+                username=f"bench{index}",
+                grade=grades[index % len(grades)],
+                admission_date=date(2020, 6, 1),
+                parent_name="bench",
+                parent_contact_number="0",
+            )
+            for index in range(500)
+        ]
+        books = Book.objects.bulk_create(
+            [Book(title=f"Book {index}", author="bench", total_copies=5, available_copies=5) for index in range(2000)]
+        )
+        start = date.today() - timedelta(days=5 * 365)
+
+        def records(count):
+            for _ in range(count):
+                student = random.choice(students)
+                borrowed = start + timedelta(days=random.randint(0, 5 * 365))
+                due = borrowed + timedelta(days=14)
+                returned = due - timedelta(days=random.randint(-3, 10)) if due < date.today() - timedelta(days=30) else None
+                status = "BORROWED" if returned is None else ("OVERDUE" if returned > due else "RETURNED")
+                yield LibraryRecord(
+                    grade_id=student.grade_id,
+                    student=student,
+                    book=random.choice(books),
+                    borrowed_date=borrowed,
+                    due_date=due,
+                    return_date=returned,
+                    status=status,
+                )
+
+        def fees(count):
+            for _ in range(count):
+                student = random.choice(students)
+                due = start + timedelta(days=random.randint(0, 5 * 365))
+                paid = due < date.today() - timedelta(days=60) or random.random() < 0.5
+                yield FeeRecord(
+                    grade_id=student.grade_id,
+                    student=student,
+                    amount=100,
+                    due_date=due,
+                    payment_date=due if paid else None,
+                    status="PAID" if paid else "PENDING",
+                )
+
+        for model, generator, count in ((LibraryRecord, records, rows), (FeeRecord, fees, fee_rows)):
+            batch = 10_000
+            for offset in range(0, count, batch):
+                model.objects.bulk_create(generator(min(batch, count - offset)), batch_size=batch)
+
+        self.sample_student = random.choice(students)
+        self.sample_grade = random.choice(grades)
+
+    def queries(self):
+        """Access paths used by the views, as (queryset, whether only counted)."""
+        today = date.today()
+        return {
+            "Overdue sweep (status, due_date)": (
+                LibraryRecord.objects.filter(status="BORROWED", due_date__lt=today).order_by(),
+                True,
+            ),
+            "Record list first page (-borrowed_date, id)": (
+                LibraryRecord.objects.order_by("-borrowed_date", "pk")[:51],
+                False,
+            ),
+            "Student history (student, -borrowed_date)": (
+                LibraryRecord.objects.filter(student=self.sample_student).order_by("-borrowed_date")[:50],
+                False,
+            ),
+            "Fee list ?status=PENDING (status, -due_date, id)": (
+                FeeRecord.objects.filter(status="PENDING").order_by("-due_date", "pk")[:51],
+                False,
+            ),
+            "Pending fees per grade (grade, status)": (
+                FeeRecord.objects.filter(grade=self.sample_grade, status="PENDING").order_by(),
+                True,
+            ),
+        }
+
+    def set_indexes(self, enabled):
+        with connection.schema_editor() as editor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    if enabled:
+                        editor.add_index(model, index)
+                    else:
+                        editor.remove_index(model, index)
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute("ANALYZE")
+            else:
+                tables = ", ".join(connection.ops.quote_name(model._meta.db_table) for model in INDEXED_MODELS)
+                cursor.execute(f"ANALYZE TABLE {tables}")
+
+    def measure(self, queries, repeat):
+        results = {}
+        for name, (queryset, counted) in queries.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                if counted:
+                    queryset.count()
+                else:
+                    list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[name] = {
+                "plan": queryset.explain(),
+                "p50": statistics.median(timings),
+                "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            }
+        return results
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from library.models import BookTally, DueDateTally
+from management.models import GradeRollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the dashboard rollup tables from the source records, "
+        "e.g. after bulk edits that bypassed the circulation service or signals."
+    )
+
+    def handle(self, *args, **options):
+        for model in (DueDateTally, BookTally, GradeRollup):
+            model.rebuild()
+            self.stdout.write(f"{model.__name__}: {model.objects.count()} rows")
+        self.stdout.write(self.style.SUCCESS("Rollups rebuilt."))
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_role'),
+        ('library', '0001_initial'),
+        ('management', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OverdueSweep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('swept_through', models.DateField()),
+                ('rows_changed', models.PositiveIntegerField(default=0)),
+                ('duration', models.FloatField(default=0)),
+                ('ran_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-swept_through'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='libraryrecord',
+            index=models.Index(fields=['status', 'due_date'], name='record_status_due_idx'),
+        ),
+    ]
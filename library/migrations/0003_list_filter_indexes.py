@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_role'),
+        ('library', '0002_overduesweep_record_status_due_idx'),
+        ('management', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='libraryrecord',
+            index=models.Index(fields=['student', '-borrowed_date'], name='record_student_borrowed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='libraryrecord',
+            index=models.Index(fields=['-borrowed_date', 'id'], name='record_borrowed_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_tallies(apps, schema_editor):
+    LibraryRecord = apps.get_model('library', 'LibraryRecord')
+    DueDateTally = apps.get_model('library', 'DueDateTally')
+    BookTally = apps.get_model('library', 'BookTally')
+    DueDateTally.objects.bulk_create(
+        DueDateTally(due_date=row['due_date'], out_count=row['count'])
+        for row in LibraryRecord.objects.filter(return_date__isnull=True)
+        .order_by().values('due_date').annotate(count=Count('pk'))
+    )
+    BookTally.objects.bulk_create(
+        BookTally(book_id=row['book'], times_borrowed=row['count'])
+        for row in LibraryRecord.objects.order_by().values('book').annotate(count=Count('pk'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0003_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookTally',
+            fields=[
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='tally', serialize=False, to='library.book')),
+                ('times_borrowed', models.PositiveIntegerField(db_index=True, default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DueDateTally',
+            fields=[
+                ('due_date', models.DateField(primary_key=True, serialize=False)),
+                ('out_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_tallies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0004_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booktally',
+            name='times_borrowed',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+    ]
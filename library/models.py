@@ -1,7 +1,20 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
 from datetime import date
 
 
+def bump_counter(model, lookup, field, delta):
+    """Add ``delta`` to a rollup counter row, creating the row if needed."""
+    if model.objects.filter(**lookup).update(**{field: F(field) + delta}) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **{field: delta})
+    except IntegrityError:
+        # Created concurrently; add to the row that won.
+        model.objects.filter(**lookup).update(**{field: F(field) + delta})
+
+
 class Book(models.Model):
     title = models.CharField(max_length=200)
     author = models.CharField(max_length=200)
@@ -36,3 +49,66 @@ class LibraryRecord(models.Model):
 
     class Meta:
         ordering = ["-borrowed_date"]
+        indexes = [
+            models.Index(fields=["status", "due_date"], name="record_status_due_idx"),
+            models.Index(fields=["student", "-borrowed_date"], name="record_student_borrowed_idx"),
+            models.Index(fields=["-borrowed_date", "id"], name="record_borrowed_idx"),
+        ]
+
+
+class OverdueSweep(models.Model):
+    """Watermark left by each overdue sweep; due dates before it are done."""
+
+    swept_through = models.DateField()
+    rows_changed = models.PositiveIntegerField(default=0)
+    duration = models.FloatField(default=0)
+    ran_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-swept_through"]
+
+    def __str__(self):
+        return f"{self.swept_through} - {self.rows_changed} records"
+
+
+class DueDateTally(models.Model):
+    """Open loans per due date, maintained by library.circulation."""
+
+    due_date = models.DateField(primary_key=True)
+    out_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.due_date} - {self.out_count} out"
+
+    @classmethod
+    def rebuild(cls):
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                cls(due_date=row["due_date"], out_count=row["count"])
+                for row in LibraryRecord.objects.filter(return_date__isnull=True)
+                .order_by()
+                .values("due_date")
+                .annotate(count=Count("pk"))
+            )
+
+
+class BookTally(models.Model):
+    """Times each book has been borrowed, maintained by library.circulation."""
+
+    book = models.OneToOneField(
+        Book, on_delete=models.CASCADE, primary_key=True, related_name="tally"
+    )
+    times_borrowed = models.IntegerField(default=0, db_index=True)
+
+    def __str__(self):
+        return f"{self.book_id} - {self.times_borrowed} loans"
+
+    @classmethod
+    def rebuild(cls):
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                cls(book_id=row["book"], times_borrowed=row["count"])
+                for row in LibraryRecord.objects.order_by().values("book").annotate(count=Count("pk"))
+            )
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete
+
+from accounts.caching import track_versions
+from . import circulation
+from .models import Book, LibraryRecord
+
+
+def release_record(sender, instance, **kwargs):
+    circulation.release(instance)
+
+
+post_delete.connect(release_record, sender=LibraryRecord, dispatch_uid="circulation_record_delete")
+
+track_versions(Book)
@@ -0,0 +1,15 @@
+from django.core.management import call_command
+
+from administration.jobs import task
+from .circulation import sweep_overdue
+
+
+@task("library.sweep_overdue")
+def sweep_overdue_task(job, full=False):
+    sweep = sweep_overdue(full=full)
+    return {"rows_changed": sweep.rows_changed}
+
+
+@task("library.rebuild_rollups")
+def rebuild_rollups_task(job):
+    call_command("rebuild_rollups")
@@ -1,3 +1,201 @@
-from django.test import TestCase
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import Librarian, Student
+from management.models import Grade
+from . import circulation
+from .circulation import NoCopiesAvailable, sweep_overdue
+from .models import Book, BookTally, DueDateTally, LibraryRecord, OverdueSweep
+
+# Tests must not write to the file-based shared cache under BASE_DIR.
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "shared"},
+}
+
+TODAY = date(2026, 3, 10)
+
+
+class LibraryTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.grade = Grade.objects.create(standard=7, section="A")
+        cls.student = Student.objects.create(
+            username="reader",
+            grade=cls.grade,
+            admission_date=date(2024, 6, 1),
+            parent_name="Parent",
+            parent_contact_number="9000000000",
+        )
+        cls.book = Book.objects.create(title="Dune", author="Herbert", total_copies=1, available_copies=1)
+
+    def make_record(self, due_date, **fields):
+        fields.setdefault("status", "BORROWED")
+        return LibraryRecord.objects.create(
+            grade=self.grade,
+            student=self.student,
+            book=self.book,
+            borrowed_date=due_date - timedelta(days=14),
+            due_date=due_date,
+            **fields,
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CirculationTests(LibraryTestCase):
+    def new_record(self, book=None, due_date=TODAY):
+        return LibraryRecord(grade=self.grade, student=self.student, book=book or self.book, due_date=due_date)
+
+    def available(self, book):
+        return Book.objects.get(pk=book.pk).available_copies
+
+    def out_on(self, due_date):
+        return DueDateTally.objects.get(due_date=due_date).out_count
+
+    def test_last_copy_cannot_be_oversold(self):
+        circulation.checkout(self.new_record())
+        with self.assertRaises(NoCopiesAvailable):
+            circulation.checkout(self.new_record())
+        self.assertEqual(self.available(self.book), 0)
+        self.assertEqual(LibraryRecord.objects.count(), 1)
+        self.assertEqual(self.out_on(TODAY), 1)
+        self.assertEqual(BookTally.objects.get(book=self.book).times_borrowed, 1)
+
+    def test_return_and_unreturn_move_the_copy(self):
+        record = circulation.checkout(self.new_record())
+        circulation.return_book(record, return_date=TODAY)
+        self.assertEqual((record.status, self.available(self.book), self.out_on(TODAY)), ("RETURNED", 1, 0))
+
+        record.return_date = None
+        circulation.save_changes(record)
+        self.assertEqual((self.available(self.book), self.out_on(TODAY)), (0, 1))
+
+    def test_book_swap_moves_exactly_one_copy(self):
+        other = Book.objects.create(title="Emma", author="Austen", total_copies=2, available_copies=2)
+        record = circulation.checkout(self.new_record())
+
+        record.book = other
+        circulation.save_changes(record)
+        self.assertEqual((self.available(self.book), self.available(other)), (1, 1))
+        self.assertEqual(self.out_on(TODAY), 1)
+        self.assertEqual(
+            dict(BookTally.objects.values_list("book_id", "times_borrowed")),
+            {self.book.pk: 0, other.pk: 1},
+        )
+
+    def test_swap_to_an_unavailable_book_changes_nothing(self):
+        taken = Book.objects.create(title="Ulysses", author="Joyce", total_copies=1, available_copies=0)
+        record = circulation.checkout(self.new_record())
+        record.book = taken
+        with self.assertRaises(NoCopiesAvailable):
+            circulation.save_changes(record)
+        self.assertEqual(LibraryRecord.objects.get(pk=record.pk).book_id, self.book.pk)
+        self.assertEqual((self.available(self.book), self.available(taken)), (0, 0))
+
+    def test_discard_releases_only_open_loans(self):
+        record = circulation.checkout(self.new_record())
+        circulation.discard(record)
+        self.assertEqual((self.available(self.book), self.out_on(TODAY)), (1, 0))
+
+        record = circulation.checkout(self.new_record())
+        circulation.return_book(record, return_date=TODAY)
+        circulation.discard(record)
+        self.assertEqual(self.available(self.book), 1)
+        self.assertFalse(LibraryRecord.objects.exists())
+
+    def test_deleting_a_student_releases_their_open_loans(self):
+        circulation.checkout(self.new_record())
+        self.student.delete()
+        self.assertEqual((self.available(self.book), self.out_on(TODAY)), (1, 0))
+        self.assertEqual(BookTally.objects.get(book=self.book).times_borrowed, 0)
+
+    def test_queryset_deletes_release_copies_once(self):
+        circulation.checkout(self.new_record())
+        LibraryRecord.objects.all().delete()
+        self.assertEqual((self.available(self.book), self.out_on(TODAY)), (1, 0))
+
+    def test_discarding_an_uncounted_record_goes_negative(self):
+        # Made without circulation, so the tally never counted it.
+        BookTally.objects.create(book=self.book, times_borrowed=0)
+        record = self.make_record(TODAY, return_date=TODAY, status="RETURNED")
+        circulation.discard(record)
+        self.assertEqual(BookTally.objects.get(book=self.book).times_borrowed, -1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SweepOverdueTests(LibraryTestCase):
+    def status(self, record):
+        return LibraryRecord.objects.get(pk=record.pk).status
+
+    def test_flips_past_due_records_only(self):
+        past = self.make_record(TODAY - timedelta(days=1))
+        due_today = self.make_record(TODAY)
+        returned = self.make_record(TODAY - timedelta(days=5), status="RETURNED", return_date=TODAY)
+
+        sweep = sweep_overdue(today=TODAY)
+        self.assertEqual(sweep.rows_changed, 1)
+        self.assertEqual(sweep.swept_through, TODAY)
+        self.assertEqual(
+            [self.status(record) for record in (past, due_today, returned)],
+            ["OVERDUE", "BORROWED", "RETURNED"],
+        )
+
+    def test_later_sweeps_start_at_the_watermark(self):
+        sweep_overdue(today=TODAY)
+        # Due before the watermark, so an incremental sweep never looks at it.
+        missed = self.make_record(TODAY - timedelta(days=3))
+        newly_due = self.make_record(TODAY + timedelta(days=1))
+
+        later = TODAY + timedelta(days=5)
+        sweep = sweep_overdue(today=later)
+        self.assertEqual(sweep.rows_changed, 1)
+        self.assertEqual((self.status(missed), self.status(newly_due)), ("BORROWED", "OVERDUE"))
+        self.assertEqual(OverdueSweep.objects.first().swept_through, later)
+
+        sweep = sweep_overdue(today=later, full=True)
+        self.assertEqual(sweep.rows_changed, 1)
+        self.assertEqual(self.status(missed), "OVERDUE")
+
+    def test_watermark_never_moves_back(self):
+        sweep_overdue(today=TODAY)
+        self.assertEqual(sweep_overdue(today=TODAY - timedelta(days=2)).swept_through, TODAY)
+
+    def test_empty_tallies_are_dropped_and_negative_ones_kept(self):
+        DueDateTally.objects.create(due_date=TODAY, out_count=0)
+        DueDateTally.objects.create(due_date=TODAY + timedelta(days=1), out_count=2)
+        DueDateTally.objects.create(due_date=TODAY + timedelta(days=2), out_count=-1)
+
+        with self.assertLogs("library.circulation", "ERROR") as logs:
+            sweep_overdue(today=TODAY)
+        self.assertIn(str(TODAY + timedelta(days=2)), logs.output[0])
+        self.assertEqual(
+            sorted(DueDateTally.objects.values_list("out_count", flat=True)),
+            [-1, 2],
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RecordEditFormViewTests(LibraryTestCase):
+    def setUp(self):
+        self.url = reverse("record_edit_form", args=[self.make_record(TODAY).pk])
+
+    def test_anonymous_and_other_roles_are_refused(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_librarian_gets_the_form(self):
+        self.client.force_login(Librarian.objects.create(username="desk"))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["form"].instance.pk, response.context["record"].pk)
+
+    def test_invalid_update_is_logged_not_printed(self):
+        self.client.force_login(Librarian.objects.create(username="desk"))
+        record = LibraryRecord.objects.get()
+        with self.assertLogs("library.views", "DEBUG") as logs:
+            response = self.client.post(reverse("record_update", args=[record.pk]), {"due_date": "not a date"})
+        self.assertRedirects(response, reverse("record_list"), fetch_redirect_response=False)
+        self.assertIn(f"Record {record.pk} not updated", logs.output[0])
@@ -2,12 +2,14 @@ from django.urls import path
 from .import views
 
 urlpatterns = [
-    path('librarian/dashboard/', views.LibrarianDashboard.as_view(), name='librarian_dashboard'),
+    path('librarian/dashboard/', views.librarian_dashboard, name='librarian_dashboard'),
     # library history
     path('records/', views.LibraryRecordListView.as_view(), name='record_list'),
+    path('records/export/', views.LibraryRecordExportView.as_view(), name='record_export'),
     path('records/create/', views.LibraryRecordCreateView.as_view(), name='record_create'),
     path('records/<int:pk>/', views.LibraryRecordDetailView.as_view(), name='record_detail'),
     path('records/update/<int:pk>/', views.LibraryRecordUpdateView.as_view(), name='record_update'),
+    path('records/<int:pk>/edit-form/', views.LibraryRecordEditFormView.as_view(), name='record_edit_form'),
     path('records/delete/<int:pk>/', views.LibraryRecordDeleteView.as_view(), name='record_delete'),
 
     # Book
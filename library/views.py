@@ -1,4 +1,5 @@
-from datetime import date
+import logging
+
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views.generic import (
@@ -7,30 +8,43 @@ from django.views.generic import (
     UpdateView,
     DeleteView,
     DetailView,
-    TemplateView,
 )
+from . import circulation
+from .circulation import NoCopiesAvailable
 from .models import LibraryRecord, Book
 from .forms import LibraryRecordForm, BookForm
 from django.contrib import messages
+from django.template.response import TemplateResponse
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.utils.decorators import method_decorator
+from accounts.caching import CachedPageMixin
+from accounts.concurrency import gather_queries
 from accounts.decorators import role_required
+from accounts.exports import ExportView
+from accounts.pagination import KeysetPaginationMixin
+from administration.counters import get_counters
+from school_management.routers import ReplicaReadsMixin, reads_from_replica
 
+logger = logging.getLogger("library.views")
 
-@method_decorator(role_required(allowed_roles=["librarian"]), name="dispatch")
-class LibrarianDashboard(TemplateView, LoginRequiredMixin):
-    template_name = "library/librarian_dashboard.html"
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context["page_title"] = "Librarian Dashboard"
-        return context
+@role_required(allowed_roles=["librarian"])
+@reads_from_replica
+async def librarian_dashboard(request):
+    stats, counters = await gather_queries(circulation.librarian_stats, get_counters)
+    context = {
+        "page_title": "Librarian Dashboard",
+        **stats,
+        "books_count": counters["books_count"],
+        "books_to_return": stats["books_out"],
+    }
+    return TemplateResponse(request, "library/librarian_dashboard.html", context)
 
 
 @method_decorator(
     role_required(allowed_roles=["admin", "staff", "librarian"]), name="dispatch"
 )
-class LibraryRecordListView(ListView, LoginRequiredMixin, PermissionRequiredMixin):
+class LibraryRecordListView(ReplicaReadsMixin, KeysetPaginationMixin, ListView, LoginRequiredMixin, PermissionRequiredMixin):
     model = LibraryRecord
     template_name = "library/record_list.html"
     context_object_name = "records"
@@ -39,12 +53,60 @@ class LibraryRecordListView(ListView, LoginRequiredMixin, PermissionRequiredMixi
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["page_title"] = "Record List"
+        # Edit forms are loaded per row on demand from LibraryRecordEditFormView.
         context["form"] = LibraryRecordForm()
-        context["edit_forms"] = {
-            record.id: LibraryRecordForm(instance=record)
-            for record in context["records"]
-        }
+        return context
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("student__grade", "book")
+
+
+@method_decorator(
+    role_required(allowed_roles=["admin", "staff", "librarian"]), name="dispatch"
+)
+class LibraryRecordExportView(LoginRequiredMixin, ExportView):
+    filename = "library-records"
+    columns = [
+        ("Registration ID", "student__registration_id"),
+        ("Username", "student__username"),
+        ("Standard", "grade__standard"),
+        ("Section", "grade__section"),
+        ("Book", "book__title"),
+        ("Author", "book__author"),
+        ("Borrowed Date", "borrowed_date"),
+        ("Due Date", "due_date"),
+        ("Return Date", "return_date"),
+        ("Status", "status"),
+        ("Remarks", "remarks"),
+    ]
+
+    def get_queryset(self):
+        queryset = LibraryRecord.objects.order_by("-borrowed_date", "pk")
+        status_filter = self.request.GET.get("status")
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        grade_id = self.request.GET.get("grade")
+        if grade_id:
+            try:
+                queryset = queryset.filter(grade_id=int(grade_id))
+            except ValueError:
+                pass
+        return queryset
+
 
+@method_decorator(
+    role_required(allowed_roles=["admin", "staff", "librarian"]), name="dispatch"
+)
+class LibraryRecordEditFormView(LoginRequiredMixin, DetailView):
+    """Renders the edit form of a single record for the list page's modal."""
+
+    model = LibraryRecord
+    template_name = "library/record_edit_form.html"
+    context_object_name = "record"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["form"] = LibraryRecordForm(instance=self.object)
         return context
 
 
@@ -66,9 +128,13 @@ class LibraryRecordCreateView(CreateView, LoginRequiredMixin, PermissionRequired
         return context
 
     def form_valid(self, form):
-        response = super().form_valid(form)
+        try:
+            self.object = circulation.checkout(form.save(commit=False))
+        except NoCopiesAvailable as exc:
+            messages.error(self.request, str(exc))
+            return redirect("record_list")
         messages.success(self.request, "Record created successfully.")
-        return response
+        return redirect(self.get_success_url())
 
     def form_invalid(self, form):
         messages.error(self.request, "Error creating record.")
@@ -98,23 +164,16 @@ class LibraryRecordUpdateView(UpdateView, LoginRequiredMixin, PermissionRequired
         return kwargs
 
     def form_valid(self, form):
-        return_date = form.cleaned_data.get("return_date")
-        due_date = form.cleaned_data.get("due_date")
-        if return_date:
-            if return_date > due_date:
-                form.instance.status = "OVERDUE"
-            else:
-                form.instance.status = "RETURNED"
-        elif due_date and date.today() > due_date:
-            form.instance.status = "OVERDUE"
-        else:
-            form.instance.status = "BORROWED"
-        response = super().form_valid(form)
+        try:
+            self.object = circulation.save_changes(form.save(commit=False))
+        except NoCopiesAvailable as exc:
+            messages.error(self.request, str(exc))
+            return redirect("record_list")
         messages.success(self.request, "Record updated successfully.")
-        return response
+        return redirect(self.get_success_url())
 
     def form_invalid(self, form):
-        print(form.errors)
+        logger.debug("Record %s not updated: %s", self.object.pk, form.errors.as_json())
         messages.error(self.request, "Error updating record.")
         return redirect("record_list")
 
@@ -127,10 +186,10 @@ class LibraryRecordDeleteView(DeleteView, LoginRequiredMixin, PermissionRequired
     success_url = reverse_lazy("record_list")
     permission_required = "library.delete_libraryrecord"
 
-    def delete(self, request, *args, **kwargs):
-        response = super().delete(request, *args, **kwargs)
+    def form_valid(self, form):
+        circulation.discard(self.object)
         messages.success(self.request, "Record deleted successfully.")
-        return response
+        return redirect(self.get_success_url())
 
 
 @method_decorator(
@@ -146,8 +205,9 @@ class LibraryRecordDetailView(DetailView, LoginRequiredMixin, PermissionRequired
 @method_decorator(
     role_required(allowed_roles=["admin", "staff", "librarian"]), name="dispatch"
 )
-class BookListView(ListView, LoginRequiredMixin, PermissionRequiredMixin):
+class BookListView(CachedPageMixin, KeysetPaginationMixin, ListView, LoginRequiredMixin, PermissionRequiredMixin):
     model = Book
+    cache_models = [Book]
     template_name = "library/book_list.html"
     context_object_name = "books"
     page_title = "Book List"
@@ -156,7 +216,6 @@ class BookListView(ListView, LoginRequiredMixin, PermissionRequiredMixin):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["page_title"] = "Book List"
-        context["add_form"] = self.get_form()
         return context
 
 
@@ -1,4 +1,5 @@
 from django import forms
+from django.urls import reverse_lazy
 from .models import Department, FeeRecord, Grade
 from accounts.models import Student
 
@@ -59,28 +60,25 @@ class FeeRecordForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        print("grade" in self.data)
+        # Only students of one grade are ever loaded. The picker fetches the
+        # rest from the student_search endpoint, and validation becomes a
+        # single primary key lookup scoped to the submitted grade.
+        grade_id = self.data.get("grade") or self.initial.get("grade")
+        if grade_id is None and self.instance.pk:
+            grade_id = self.instance.grade_id
+        try:
+            grade_id = int(grade_id)
+        except (TypeError, ValueError):
+            grade_id = None
 
-        if self.instance.pk:
-            # If editing existing record, show students from the selected grade
-            self.fields["student"].queryset = Student.objects.filter(
-                grade=self.instance.grade
-            ).order_by("first_name", "last_name")
-        elif "grade" in self.initial:
-            # Handle GET request or initial display when grade is pre-populated
-            grade_id = self.initial.get("grade")
+        if grade_id is None:
+            self.fields["student"].queryset = Student.objects.none()
+        else:
             self.fields["student"].queryset = Student.objects.filter(
                 grade_id=grade_id
             ).order_by("first_name", "last_name")
-        else:
-            # Initially or if no grade selected, show no students
-            self.fields["student"].queryset = Student.objects.all()
-
-        # Override the student display format
-        for student in self.fields["student"].queryset:
-            student.display_name = (
-                f"{student.first_name} {student.last_name} ({student.registration_id})"
-            )
+        self.fields["student"].label_from_instance = student_display_name
+        self.fields["student"].widget.attrs["data-source-url"] = reverse_lazy("student_search")
 
     def clean_payment_date(self):
         payment_date = self.cleaned_data.get("payment_date")
@@ -89,3 +87,7 @@ class FeeRecordForm(forms.ModelForm):
         if status == "PAID" and not payment_date:
             raise forms.ValidationError("Payment date is required when status is Paid")
         return payment_date
+
+
+def student_display_name(student):
+    return f"{student.first_name} {student.last_name} ({student.registration_id})"
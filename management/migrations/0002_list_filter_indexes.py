@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_role'),
+        ('management', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feerecord',
+            index=models.Index(fields=['status', '-due_date', 'id'], name='fee_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feerecord',
+            index=models.Index(fields=['grade', 'status'], name='fee_grade_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feerecord',
+            index=models.Index(fields=['-due_date', 'id'], name='fee_due_idx'),
+        ),
+    ]
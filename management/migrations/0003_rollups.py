@@ -0,0 +1,44 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_rollups(apps, schema_editor):
+    Student = apps.get_model('accounts', 'Student')
+    FeeRecord = apps.get_model('management', 'FeeRecord')
+    GradeRollup = apps.get_model('management', 'GradeRollup')
+    rollups = {}
+    for row in Student.objects.order_by().values('grade').annotate(count=Count('pk')):
+        rollups[row['grade']] = GradeRollup(grade_id=row['grade'], student_count=row['count'])
+    pending = (
+        FeeRecord.objects.filter(status='PENDING').order_by()
+        .values('grade').annotate(count=Count('pk'), amount=Sum('amount'))
+    )
+    for row in pending:
+        rollup = rollups.setdefault(row['grade'], GradeRollup(grade_id=row['grade']))
+        rollup.pending_fee_count = row['count']
+        rollup.pending_fee_amount = row['amount']
+    GradeRollup.objects.bulk_create(rollups.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_role'),
+        ('management', '0002_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeRollup',
+            fields=[
+                ('grade', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rollup', serialize=False, to='management.grade')),
+                ('student_count', models.IntegerField(default=0)),
+                ('pending_fee_count', models.IntegerField(default=0)),
+                ('pending_fee_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Sum
 from accounts.models import Student
 
 
@@ -36,3 +39,61 @@ class FeeRecord(models.Model):
 
     class Meta:
         ordering = ["-due_date"]
+        indexes = [
+            models.Index(fields=["status", "-due_date", "id"], name="fee_status_due_idx"),
+            models.Index(fields=["grade", "status"], name="fee_grade_status_idx"),
+            models.Index(fields=["-due_date", "id"], name="fee_due_idx"),
+        ]
+
+
+class GradeRollup(models.Model):
+    """Per-grade roster and pending fee totals, maintained by signals."""
+
+    grade = models.OneToOneField(
+        Grade, on_delete=models.CASCADE, primary_key=True, related_name="rollup"
+    )
+    student_count = models.IntegerField(default=0)
+    pending_fee_count = models.IntegerField(default=0)
+    pending_fee_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.grade_id} - {self.student_count} students"
+
+    @classmethod
+    def bump(cls, grade_id, students=0, pending_fees=0, pending_amount=0):
+        deltas = {
+            "student_count": students,
+            "pending_fee_count": pending_fees,
+            "pending_fee_amount": Decimal(pending_amount),
+        }
+        changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if not changes or cls.objects.filter(grade_id=grade_id).update(**changes):
+            return
+        if any(delta < 0 for delta in deltas.values()):
+            # Nothing to take away from a grade without a rollup row.
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(grade_id=grade_id, **deltas)
+        except IntegrityError:
+            # Created concurrently; add to the row that won.
+            cls.objects.filter(grade_id=grade_id).update(**changes)
+
+    @classmethod
+    def rebuild(cls):
+        rollups = {}
+        for row in Student.objects.order_by().values("grade").annotate(count=Count("pk")):
+            rollups[row["grade"]] = cls(grade_id=row["grade"], student_count=row["count"])
+        pending = (
+            FeeRecord.objects.filter(status="PENDING")
+            .order_by()
+            .values("grade")
+            .annotate(count=Count("pk"), amount=Sum("amount"))
+        )
+        for row in pending:
+            rollup = rollups.setdefault(row["grade"], cls(grade_id=row["grade"]))
+            rollup.pending_fee_count = row["count"]
+            rollup.pending_fee_amount = row["amount"]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rollups.values())
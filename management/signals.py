@@ -0,0 +1,61 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from accounts.caching import track_versions
+from accounts.models import Staff, Student
+from .models import Department, FeeRecord, Grade, GradeRollup
+
+
+def remember_student_grade(sender, instance, **kwargs):
+    instance._rollup_grade_id = (
+        Student.objects.filter(pk=instance.pk).values_list("grade_id", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+def count_student(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_rollup_grade_id", None)
+    if previous == instance.grade_id and not created:
+        return
+    if previous is not None:
+        GradeRollup.bump(previous, students=-1)
+    GradeRollup.bump(instance.grade_id, students=1)
+
+
+def uncount_student(sender, instance, **kwargs):
+    GradeRollup.bump(instance.grade_id, students=-1)
+
+
+def remember_fee(sender, instance, **kwargs):
+    instance._rollup_fee = (
+        FeeRecord.objects.filter(pk=instance.pk).values("grade_id", "status", "amount").first()
+        if instance.pk
+        else None
+    )
+
+
+def count_fee(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_rollup_fee", None)
+    if previous and previous["status"] == "PENDING":
+        GradeRollup.bump(previous["grade_id"], pending_fees=-1, pending_amount=-previous["amount"])
+    if instance.status == "PENDING":
+        GradeRollup.bump(instance.grade_id, pending_fees=1, pending_amount=instance.amount)
+
+
+def uncount_fee(sender, instance, **kwargs):
+    if instance.status == "PENDING":
+        GradeRollup.bump(instance.grade_id, pending_fees=-1, pending_amount=-instance.amount)
+
+
+pre_save.connect(remember_student_grade, sender=Student, dispatch_uid="rollup_student_pre_save")
+post_save.connect(count_student, sender=Student, dispatch_uid="rollup_student_save")
+post_delete.connect(uncount_student, sender=Student, dispatch_uid="rollup_student_delete")
+pre_save.connect(remember_fee, sender=FeeRecord, dispatch_uid="rollup_fee_pre_save")
+post_save.connect(count_fee, sender=FeeRecord, dispatch_uid="rollup_fee_save")
+post_delete.connect(uncount_fee, sender=FeeRecord, dispatch_uid="rollup_fee_delete")
+
+track_versions(Grade, Department, Staff)
@@ -1,3 +1,141 @@
-from django.test import TestCase
+import warnings
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import CacheKeyWarning
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import Admin, Student
+from . import views
+from .models import FeeRecord, Grade, GradeRollup
+
+# Tests must not write to the file-based shared cache under BASE_DIR.
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "shared"},
+}
+
+
+def make_student(username, grade, **fields):
+    return Student.objects.create(
+        username=username,
+        grade=grade,
+        admission_date=date(2024, 6, 1),
+        parent_name="Parent",
+        parent_contact_number="9000000000",
+        **fields,
+    )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class GradeRollupSignalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seven = Grade.objects.create(standard=7, section="A")
+        cls.eight = Grade.objects.create(standard=8, section="A")
+
+    def rollup(self, grade):
+        row = GradeRollup.objects.filter(grade=grade).first()
+        if row is None:
+            return (0, 0, Decimal("0"))
+        return (row.student_count, row.pending_fee_count, row.pending_fee_amount)
+
+    def test_students_are_counted_moved_and_removed(self):
+        first = make_student("first", self.seven)
+        make_student("second", self.seven)
+        self.assertEqual(self.rollup(self.seven)[0], 2)
+
+        first.grade = self.eight
+        first.save()
+        self.assertEqual((self.rollup(self.seven)[0], self.rollup(self.eight)[0]), (1, 1))
+
+        # A save that keeps the grade changes nothing.
+        first.parent_name = "Guardian"
+        first.save()
+        self.assertEqual(self.rollup(self.eight)[0], 1)
+
+        first.delete()
+        self.assertEqual(self.rollup(self.eight)[0], 0)
+
+    def test_pending_fees_follow_status_and_amount(self):
+        student = make_student("payer", self.seven)
+        fee = FeeRecord.objects.create(
+            student=student, grade=self.seven, amount=Decimal("500.00"), due_date=date(2026, 4, 1)
+        )
+        self.assertEqual(self.rollup(self.seven), (1, 1, Decimal("500.00")))
+
+        fee.amount = Decimal("650.00")
+        fee.save()
+        self.assertEqual(self.rollup(self.seven)[1:], (1, Decimal("650.00")))
+
+        fee.status = "PAID"
+        fee.save()
+        self.assertEqual(self.rollup(self.seven)[1:], (0, Decimal("0.00")))
+
+        fee.status = "PENDING"
+        fee.save()
+        fee.delete()
+        self.assertEqual(self.rollup(self.seven)[1:], (0, Decimal("0.00")))
+
+    def test_rebuild_matches_the_signals(self):
+        student = make_student("counted", self.seven)
+        FeeRecord.objects.create(student=student, grade=self.seven, amount=Decimal("120.00"), due_date=date(2026, 4, 1))
+        before = self.rollup(self.seven)
+        GradeRollup.rebuild()
+        self.assertEqual(self.rollup(self.seven), before)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class StudentSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.grade = Grade.objects.create(standard=7, section="A")
+        other = Grade.objects.create(standard=8, section="A")
+        for number in range(5):
+            make_student(f"pupil{number}", cls.grade, first_name=f"Anu{number}", last_name="Rao")
+        make_student("bala", cls.grade, first_name="Bala", last_name="Anand")
+        make_student("elsewhere", other, first_name="Anu", last_name="Other")
+        cls.admin = Admin.objects.create(username="head")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def search(self, **params):
+        response = self.client.get(reverse("student_search"), {"grade": self.grade.pk, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def names(self, data):
+        return [item["text"].split(" (")[0] for item in data["results"]]
+
+    def test_only_staff_and_admins_may_search(self):
+        self.client.force_login(Student.objects.get(username="bala"))
+        response = self.client.get(reverse("student_search"), {"grade": self.grade.pk})
+        self.assertEqual(response.status_code, 403)
+
+    def test_pages_cover_the_grade_once(self):
+        with mock.patch.object(views, "STUDENT_SEARCH_PAGE_SIZE", 4):
+            first = self.search()
+            second = self.search(page=2)
+        self.assertEqual(first["next_page"], 2)
+        self.assertIsNone(second["next_page"])
+        self.assertEqual(
+            self.names(first) + self.names(second),
+            [f"Anu{number} Rao" for number in range(5)] + ["Bala Anand"],
+        )
+
+    def test_term_matches_name_and_registration_prefixes(self):
+        self.assertEqual(self.names(self.search(q="bal")), ["Bala Anand"])
+        self.assertEqual(self.names(self.search(q="ANAND")), ["Bala Anand"])
+        registration_id = Student.objects.get(username="pupil3").registration_id
+        self.assertEqual(self.names(self.search(q=registration_id)), ["Anu3 Rao"])
+
+    def test_any_term_makes_a_valid_cache_key(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", CacheKeyWarning)
+            self.assertEqual(self.search(q="anu rao\n" + "x" * 300)["results"], [])
+
+    def test_bad_parameters_return_no_results(self):
+        self.assertEqual(self.search(grade="x"), {"results": [], "next_page": None})
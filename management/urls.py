@@ -22,9 +22,11 @@ urlpatterns = [
     ),
     # FeeRecord
     path('fees/', views.FeeRecordListView.as_view(), name='fee_list'),
+    path('fees/export/', views.FeeRecordExportView.as_view(), name='fee_export'),
     path('fees/<int:pk>/', views.FeeRecordDetailView.as_view(), name='fee_detail'),
     path('fees/create/', views.FeeRecordCreateView.as_view(), name='fee_create'),
     path('fees/update/<int:pk>/', views.FeeRecordUpdateView.as_view(), name='fee_update'),
     path('fees/delete/<int:pk>/', views.FeeRecordDeleteView.as_view(), name='fee_delete'),
+    path('students/search/', views.student_search, name='student_search'),
 
 ]
@@ -1,5 +1,11 @@
+import hashlib
+
 from django.shortcuts import redirect
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import JsonResponse
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import (
@@ -10,19 +16,30 @@ from django.views.generic import (
     DetailView,
 )
 
+from accounts.caching import CachedPageMixin
 from accounts.decorators import role_required
+from accounts.exports import ExportView
+from accounts.pagination import KeysetPaginationMixin
+from school_management.routers import ReplicaReadsMixin
 from .models import Grade, FeeRecord, Department
-from .forms import GradeForm, DepartmentForm, FeeRecordForm
-from accounts.models import Staff
+from .forms import GradeForm, DepartmentForm, FeeRecordForm, student_display_name
+from accounts.models import Staff, Student
 from django.utils.decorators import method_decorator
 
+STUDENT_SEARCH_PAGE_SIZE = 50
+STUDENT_SEARCH_CACHE_TIMEOUT = 30
+
 
 @method_decorator(role_required(allowed_roles=["admin", "staff"]), name="dispatch")
-class GradeListView(LoginRequiredMixin, ListView):
+class GradeListView(LoginRequiredMixin, CachedPageMixin, KeysetPaginationMixin, ListView):
     model = Grade
+    cache_models = [Grade, Staff]
     template_name = "management/grade_list.html"
     context_object_name = "grades"
 
+    def get_queryset(self):
+        return Grade.objects.select_related("in_charge")
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["page_title"] = "Grade List"
@@ -91,8 +108,9 @@ class GradeDeleteView(LoginRequiredMixin, DeleteView):
 
 
 @method_decorator(role_required(allowed_roles=["admin"]), name="dispatch")
-class DepartmentListView(LoginRequiredMixin, ListView):
+class DepartmentListView(LoginRequiredMixin, CachedPageMixin, ListView):
     model = Department
+    cache_models = [Department]
     template_name = "management/department_list.html"
     context_object_name = "departments"
 
@@ -171,7 +189,7 @@ class DepartmentDeleteView(LoginRequiredMixin, DeleteView):
     ),
     name="dispatch",
 )
-class FeeRecordListView(LoginRequiredMixin, ListView):
+class FeeRecordListView(LoginRequiredMixin, ReplicaReadsMixin, KeysetPaginationMixin, ListView):
     model = FeeRecord
     template_name = "management/fee_list.html"
     context_object_name = "fee_records"
@@ -189,6 +207,37 @@ class FeeRecordListView(LoginRequiredMixin, ListView):
         return context
 
 
+@method_decorator(role_required(allowed_roles=["admin", "staff"]), name="dispatch")
+class FeeRecordExportView(LoginRequiredMixin, ExportView):
+    filename = "fees"
+    columns = [
+        ("Registration ID", "student__registration_id"),
+        ("Username", "student__username"),
+        ("First Name", "student__first_name"),
+        ("Last Name", "student__last_name"),
+        ("Standard", "grade__standard"),
+        ("Section", "grade__section"),
+        ("Amount", "amount"),
+        ("Due Date", "due_date"),
+        ("Payment Date", "payment_date"),
+        ("Status", "status"),
+        ("Remarks", "remarks"),
+    ]
+
+    def get_queryset(self):
+        queryset = FeeRecord.objects.order_by("-due_date", "pk")
+        status_filter = self.request.GET.get("status")
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        grade_id = self.request.GET.get("grade")
+        if grade_id:
+            try:
+                queryset = queryset.filter(grade_id=int(grade_id))
+            except ValueError:
+                pass
+        return queryset
+
+
 @method_decorator(
     role_required(
         allowed_roles=[
@@ -272,3 +321,44 @@ class FeeRecordDeleteView(LoginRequiredMixin, DeleteView):
     def delete(self, request, *args, **kwargs):
         messages.success(request, "Librarian deleted successfully.")
         return super().delete(request, *args, **kwargs)
+
+
+@login_required
+@role_required(allowed_roles=["admin", "staff"])
+def student_search(request):
+    """JSON list of a grade's students for the fee form picker."""
+    try:
+        grade_id = int(request.GET.get("grade", ""))
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        return JsonResponse({"results": [], "next_page": None})
+    term = request.GET.get("q", "").strip()
+
+    # The term is user text; hashed, it is always a valid key of fixed length.
+    term_key = hashlib.md5(term.lower().encode(), usedforsecurity=False).hexdigest()
+    cache_key = f"student_search:{grade_id}:{page}:{term_key}"
+    data = cache.get(cache_key)
+    if data is None:
+        queryset = Student.objects.filter(grade_id=grade_id)
+        if term:
+            queryset = queryset.filter(
+                Q(first_name__istartswith=term)
+                | Q(last_name__istartswith=term)
+                | Q(registration_id__istartswith=term)
+            )
+        start = (page - 1) * STUDENT_SEARCH_PAGE_SIZE
+        students = list(
+            queryset.order_by("first_name", "last_name", "pk").only(
+                "pk", "first_name", "last_name", "registration_id"
+            )[start:start + STUDENT_SEARCH_PAGE_SIZE + 1]
+        )
+        has_more = len(students) > STUDENT_SEARCH_PAGE_SIZE
+        data = {
+            "results": [
+                {"id": student.pk, "text": student_display_name(student)}
+                for student in students[:STUDENT_SEARCH_PAGE_SIZE]
+            ],
+            "next_page": page + 1 if has_more else None,
+        }
+        cache.set(cache_key, data, STUDENT_SEARCH_CACHE_TIMEOUT)
+    return JsonResponse(data)
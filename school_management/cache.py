@@ -0,0 +1,75 @@
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.functional import cached_property
+
+_MISSING = object()
+
+
+class TieredCache(BaseCache):
+    """
+    Two-level cache: a per-process LRU in front of a shared backend.
+
+    Reads are served from the ``NEAR`` alias when possible and fall back to
+    the ``FAR`` alias, copying hits into the near tier. Writes go to both.
+    Near entries live at most ``NEAR_TIMEOUT`` seconds, which bounds how long
+    another process's delete can go unseen; keys that embed a version stamp
+    never change and are always safe to serve from the near tier.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.near_alias = options.get("NEAR", "near")
+        self.far_alias = options.get("FAR", "shared")
+        self.near_timeout = options.get("NEAR_TIMEOUT", 10)
+
+    @cached_property
+    def near(self):
+        return caches[self.near_alias]
+
+    @cached_property
+    def far(self):
+        return caches[self.far_alias]
+
+    def _near_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self.near_timeout
+        return min(timeout, self.near_timeout)
+
+    def get(self, key, default=None, version=None):
+        value = self.near.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            value = self.far.get(key, _MISSING, version=version)
+            if value is _MISSING:
+                return default
+            self.near.set(key, value, self.near_timeout, version=version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.far.set(key, value, timeout, version=version)
+        self.near.set(key, value, self._near_timeout(timeout), version=version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if not self.far.add(key, value, timeout, version=version):
+            return False
+        self.near.set(key, value, self._near_timeout(timeout), version=version)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.near.delete(key, version=version)
+        return self.far.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.near.delete(key, version=version)
+        return self.far.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.near.has_key(key, version=version) or self.far.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self.near.delete(key, version=version)
+        return self.far.incr(key, delta, version=version)
+
+    def clear(self):
+        self.near.clear()
+        self.far.clear()
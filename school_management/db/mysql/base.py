@@ -0,0 +1,7 @@
+from django.db.backends.mysql import base
+
+from school_management.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """MySQL/MariaDB with pooled connections; see school_management.db.pool."""
@@ -0,0 +1,207 @@
+"""
+Process-wide connection pool for Django database backends.
+
+Django only pools PostgreSQL connections. For the others a connection is
+either opened per request (``CONN_MAX_AGE = 0``) or kept by one thread for
+its whole life. The backends in ``school_management.db`` check
+connections out of a bounded pool instead and hand them back when Django
+closes them at the end of a request, so the handshake is paid once per
+connection rather than once per request. Configure with a ``POOL`` entry
+in the database settings::
+
+    "POOL": {"MAX_SIZE": 10, "TIMEOUT": 10, "MAX_LIFETIME": 1800, "PRE_PING": True}
+
+``MAX_SIZE`` caps the connections one process opens; a request that
+finds them all checked out waits up to ``TIMEOUT`` seconds. Connections
+older than ``MAX_LIFETIME`` are replaced, and with ``PRE_PING`` every
+checkout is pinged first so one dropped by the server is never handed out.
+``"ENABLED": False`` connects as the wrapped backend would. Leave
+``CONN_MAX_AGE`` at 0 so connections go back to the pool after a request.
+"""
+import os
+import threading
+import time
+from collections import deque
+from functools import partial
+
+from django.db import OperationalError
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, max_size=10, timeout=10, max_lifetime=1800, pre_ping=True):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.pre_ping = pre_ping
+        self.pid = os.getpid()
+        self._idle = deque()
+        self._open = 0
+        self._waiting = 0
+        self._condition = threading.Condition()
+        self._counts = {"checkouts": 0, "connects": 0, "discards": 0, "timeouts": 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self, connect, ping):
+        """Return ``(connection, opened_at)``, reusing an idle connection when possible."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            raw, opened_at = self._reserve(deadline)
+            if raw is None:
+                try:
+                    raw, opened_at = connect(), time.monotonic()
+                except BaseException:
+                    self._forget()
+                    raise
+                self._count("connects")
+            elif self._expired(opened_at) or (self.pre_ping and not ping(raw)):
+                self.discard(raw)
+                continue
+            waited = time.monotonic() - started
+            with self._condition:
+                self._counts["checkouts"] += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            return raw, opened_at
+
+    def _reserve(self, deadline):
+        """Pop an idle connection, or claim a slot for a new one (``None``)."""
+        with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._open < self.max_size:
+                    self._open += 1
+                    return None, None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counts["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No database connection free after {self.timeout}s "
+                        f"({self.max_size} open); raise POOL['MAX_SIZE']."
+                    )
+                self._waiting += 1
+                self._condition.wait(remaining)
+                self._waiting -= 1
+
+    def release(self, raw, opened_at):
+        if self._expired(opened_at):
+            self.discard(raw)
+            return
+        with self._condition:
+            self._idle.append((raw, opened_at))
+            self._condition.notify()
+
+    def discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        self._count("discards")
+        self._forget()
+
+    def _forget(self):
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+    def _count(self, name):
+        with self._condition:
+            self._counts[name] += 1
+
+    def _expired(self, opened_at):
+        return self.max_lifetime is not None and time.monotonic() - opened_at > self.max_lifetime
+
+    def stats(self):
+        with self._condition:
+            idle = len(self._idle)
+            return {
+                "max_size": self.max_size,
+                "open": self._open,
+                "idle": idle,
+                "in_use": self._open - idle,
+                "waiting": self._waiting,
+                **self._counts,
+                "wait_ms_total": round(self._wait_total * 1000, 2),
+                "wait_ms_max": round(self._wait_max * 1000, 2),
+            }
+
+
+def get_pool(key, options):
+    with _pools_lock:
+        pool = _pools.get(key)
+        # A forked worker must not share its parent's sockets; the copies
+        # are dropped without closing, which would end the parent's sessions.
+        if pool is None or pool.pid != os.getpid():
+            pool = _pools[key] = ConnectionPool(
+                max_size=options.get("MAX_SIZE", 10),
+                timeout=options.get("TIMEOUT", 10),
+                max_lifetime=options.get("MAX_LIFETIME", 1800),
+                pre_ping=options.get("PRE_PING", True),
+            )
+        return pool
+
+
+def pool_stats():
+    """Figures of every pool in this process, keyed by ``alias/NAME``."""
+    with _pools_lock:
+        pools = [(key, pool) for key, pool in _pools.items() if pool.pid == os.getpid()]
+    return {f"{key[0]}/{key[1]}": pool.stats() for key, pool in pools}
+
+
+class PooledDatabaseWrapperMixin:
+    """Take connections from and return them to the ``POOL`` of the database settings."""
+
+    _pool = None
+
+    def get_pool(self):
+        options = self.settings_dict.get("POOL")
+        if not options or not options.get("ENABLED", True):
+            return None
+        settings = self.settings_dict
+        # Keyed by what is connected to, so the test database never reuses
+        # connections opened to the real one.
+        key = (self.alias, str(settings["NAME"]), settings["HOST"], settings["PORT"], settings["USER"])
+        return get_pool(key, options)
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        raw, self._pool_opened_at = pool.acquire(
+            partial(super().get_new_connection, conn_params), self._ping
+        )
+        self._pool = pool
+        return raw
+
+    def _ping(self, raw):
+        current, self.connection = self.connection, raw
+        try:
+            return self.is_usable()
+        finally:
+            self.connection = current
+
+    def _close(self):
+        pool, raw = self._pool, self.connection
+        if pool is None or raw is None:
+            return super()._close()
+        self._pool = None
+        # A connection dropped mid-transaction or after an unexplained error
+        # is not trusted with the next request.
+        if self.in_atomic_block or self.errors_occurred:
+            pool.discard(raw)
+            return
+        try:
+            raw.rollback()
+        except Exception:
+            pool.discard(raw)
+        else:
+            pool.release(raw, self._pool_opened_at)
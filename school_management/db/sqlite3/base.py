@@ -0,0 +1,67 @@
+import logging
+import random
+import time
+from functools import partial
+
+from django.db.backends.sqlite3 import base
+
+from school_management.db.pool import PooledDatabaseWrapperMixin
+
+logger = logging.getLogger("school_management.db")
+
+
+class RetryingCursorWrapper(base.SQLiteCursorWrapper):
+    """
+    Retry statements that fail with "database is locked" with backoff.
+
+    Only statements that start a transaction of their own are retried (a
+    ``BEGIN IMMEDIATE`` or an autocommit write), since nothing has been
+    written when they fail. Inside a transaction the error is raised as usual.
+    """
+
+    def __init__(self, connection, attempts=0, backoff=0.05):
+        super().__init__(connection)
+        self.attempts = attempts
+        self.backoff = backoff
+
+    def execute(self, query, params=None):
+        return self._retry(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        return self._retry(super().executemany, query, param_list)
+
+    def _retry(self, method, *args):
+        for attempt in range(self.attempts + 1):
+            try:
+                return method(*args)
+            except base.Database.OperationalError as exc:
+                if attempt == self.attempts or self.connection.in_transaction or not _is_lock_error(exc):
+                    raise
+                # Jittered so waiting writers do not all retry at once.
+                delay = self.backoff * 2**attempt * random.uniform(0.5, 1.5)
+                logger.debug("SQLite busy, retry %d in %.3fs: %s", attempt + 1, delay, exc)
+                time.sleep(delay)
+
+
+def _is_lock_error(exc):
+    message = str(exc)
+    return "database is locked" in message or "database is busy" in message
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """
+    SQLite with pooled connections and lock-error retries.
+
+    Retries are configured with a ``RETRY`` entry in the database settings,
+    ``{"ATTEMPTS": 5, "BACKOFF": 0.05}``; without one statements fail on the
+    first lock error, as with Django's own backend.
+    """
+
+    def create_cursor(self, name=None):
+        retry = self.settings_dict.get("RETRY") or {}
+        factory = partial(
+            RetryingCursorWrapper,
+            attempts=retry.get("ATTEMPTS", 0),
+            backoff=retry.get("BACKOFF", 0.05),
+        )
+        return self.connection.cursor(factory=factory)
@@ -0,0 +1,139 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("school_management.sql")
+
+# Collapses "IN (%s, %s, %s)" so batches of different sizes share a fingerprint.
+_PLACEHOLDER_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+
+
+def fingerprint(sql):
+    return _PLACEHOLDER_LIST.sub("%s...", sql)
+
+
+class QueryStats:
+    """Queries executed while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.aliases = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+            self.aliases[context["connection"].alias] += 1
+
+    def duplicates(self):
+        """Fingerprints run more than once, most repeated first (likely N+1s)."""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Count the queries, DB time and repeated queries of every request.
+
+    The totals are exposed on ``request.sql_stats`` and in a Server-Timing
+    header, and a warning is logged when a view runs more queries than
+    ``SQL_QUERY_BUDGET``. With ``SQL_INSTRUMENTATION`` off the middleware
+    removes itself from the chain at startup, so it costs nothing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SQL_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budget = settings.SQL_QUERY_BUDGET
+
+    def __call__(self, request):
+        stats = request.sql_stats = QueryStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        duplicates = stats.duplicates()
+        timings = [
+            f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"',
+            f'dup;desc="{sum(count - 1 for _, count in duplicates)} repeated"',
+        ]
+        route = getattr(request, "db_route", None)
+        if route is not None:
+            alias, reason = route
+            timings.append(f'route;desc="{alias}: {reason}"')
+        if stats.aliases:
+            per_alias = " ".join(f"{alias}={count}" for alias, count in stats.aliases.items())
+            timings.append(f'aliases;desc="{per_alias}"')
+        timings.append(f"total;dur={total * 1000:.2f}")
+        response["Server-Timing"] = ", ".join(timings)
+        if stats.count > self.budget:
+            self.log_over_budget(request, stats, duplicates)
+        return response
+
+    def log_over_budget(self, request, stats, duplicates):
+        match = request.resolver_match
+        view = match.view_name if match else request.path
+        lines = [f"  {count}x {sql[:200]}" for sql, count in duplicates[:5]]
+        logger.warning(
+            "%s %s ran %d queries (budget %d) in %.1fms%s",
+            request.method,
+            view,
+            stats.count,
+            self.budget,
+            stats.duration * 1000,
+            "\nRepeated queries:\n" + "\n".join(lines) if lines else "",
+        )
+
+
+class ReplicaPinningMiddleware:
+    """
+    Decide whether a request may read from a replica (read-your-writes).
+
+    Only GET and HEAD requests may. Any other method sets a cookie that
+    keeps the browser on the primary for ``REPLICA_PIN_SECONDS``, long
+    enough for the replicas to apply the change it just made. Views still
+    have to opt in; see ``school_management.routers``.
+    """
+
+    cookie_name = "db_pinned_until"
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.pin_seconds = settings.REPLICA_PIN_SECONDS
+
+    def __call__(self, request):
+        safe = request.method in ("GET", "HEAD")
+        try:
+            pinned = float(request.COOKIES.get(self.cookie_name, 0)) > time.time()
+        except ValueError:
+            pinned = False
+        request.replica_allowed = safe and not pinned
+        request.db_route_reason = "write request" if not safe else "pinned after a write" if pinned else ""
+
+        response = self.get_response(request)
+        if not safe:
+            response.set_cookie(
+                self.cookie_name,
+                str(time.time() + self.pin_seconds),
+                max_age=self.pin_seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
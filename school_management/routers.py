@@ -0,0 +1,93 @@
+"""
+Send the reads of list, report and export views to a read replica.
+
+Nothing reads from a replica unless a view opts in with
+``ReplicaReadsMixin`` or ``@reads_from_replica``, and even then only for
+GET/HEAD requests from browsers that have not posted a change in the last
+``REPLICA_PIN_SECONDS`` (see ``ReplicaPinningMiddleware``), so users
+always see their own writes. Writes, and reads everywhere else, use the
+primary (``default``). Each request's choice is kept on
+``request.db_route`` and shown by ``SQLInstrumentationMiddleware``.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.template.response import SimpleTemplateResponse
+
+_replica = ContextVar("replica", default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # Related rows come from wherever the instance itself was read.
+            return instance._state.db
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+@contextmanager
+def replica_reads(request):
+    """Route reads inside the block to a replica if ``request`` may use one."""
+    reason = getattr(request, "db_route_reason", "")
+    alias = None
+    if not settings.DATABASE_REPLICAS:
+        reason = "no replicas configured"
+    elif getattr(request, "replica_allowed", False):
+        # One replica per request, so its reads see a single point in time.
+        alias = random.choice(settings.DATABASE_REPLICAS)
+        reason = "read-only view"
+    request.db_route = (alias or DEFAULT_DB_ALIAS, reason)
+    token = _replica.set(alias)
+    try:
+        yield alias
+    finally:
+        _replica.reset(token)
+
+
+class ReplicaReadsMixin:
+    """Read a view's queryset and template data from a replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(request):
+            response = super().dispatch(request, *args, **kwargs)
+            if isinstance(response, SimpleTemplateResponse):
+                # Templates evaluate lazy querysets; render while still routed.
+                response.render()
+            return response
+
+
+def reads_from_replica(view_func):
+    """Function-view version of ``ReplicaReadsMixin``; sync or async."""
+    if iscoroutinefunction(view_func):
+
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            with replica_reads(request):
+                return await view_func(request, *args, **kwargs)
+
+    else:
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            with replica_reads(request):
+                return view_func(request, *args, **kwargs)
+
+    return _wrapped_view
@@ -43,8 +43,20 @@ LOGOUT_REDIRECT_URL = "login"
 
 SESSION_COOKIE_AGE = 1209600
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
+# cached_db reads sessions from the shared cache and writes through to the
+# database; "django.contrib.sessions.backends.signed_cookies" needs no
+# server-side storage at all.
+SESSION_ENGINE = os.getenv("SESSION_ENGINE", "django.contrib.sessions.backends.cached_db")
+# The shared tier only, so a logout is seen by every process at once
+SESSION_CACHE_ALIAS = "shared"
+
+AUTHENTICATION_BACKENDS = ["accounts.backends.CachedModelBackend"]
+# Seconds a loaded user is reused by the auth middleware; saves evict it
+USER_CACHE_TIMEOUT = int(os.getenv("USER_CACHE_TIMEOUT", 300))
 
 MIDDLEWARE = [
+    "school_management.middleware.SQLInstrumentationMiddleware",
+    "school_management.middleware.ReplicaPinningMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -54,6 +66,11 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request query counts, DB time and repeated queries (Server-Timing header)
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "False").lower() in ("true", "1")
+# Requests running more queries than this log a warning
+SQL_QUERY_BUDGET = int(os.getenv("SQL_QUERY_BUDGET", 30))
+
 ROOT_URLCONF = "school_management.urls"
 
 TEMPLATES = [
@@ -85,6 +102,67 @@ DATABASES = {
     }
 }
 
+# Read replicas: aliases in DATABASES that list, report and export views
+# read from (see school_management/routers.py)
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ["school_management.routers.ReplicaRouter"]
+# Seconds a browser keeps reading from the primary after it posts a change
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
+
+# Cache
+# "default" keeps recent entries in process memory in front of the shared
+# tier: a Redis server when CACHE_URL is set, otherwise files on disk.
+SHARED_CACHE_URL = os.getenv("CACHE_URL")
+
+CACHES = {
+    "default": {
+        "BACKEND": "school_management.cache.TieredCache",
+        "OPTIONS": {"NEAR": "near", "FAR": "shared", "NEAR_TIMEOUT": 10},
+    },
+    "near": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "near",
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+    "shared": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": SHARED_CACHE_URL,
+        }
+        if SHARED_CACHE_URL
+        else {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": BASE_DIR / "cache",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    ),
+}
+
+# Seconds a rendered list page is kept; edits invalidate it sooner
+PAGE_CACHE_TIMEOUT = int(os.getenv("PAGE_CACHE_TIMEOUT", 600))
+
+# Threads (and so database connections) per process that async dashboards
+# use to run their queries side by side
+ASYNC_QUERY_THREADS = int(os.getenv("ASYNC_QUERY_THREADS", 8))
+
+
+# Background jobs (manage.py run_workers)
+# Seconds a running job may go without a heartbeat before it is requeued
+# (workers renew the lock every quarter of this while a job runs)
+JOB_LOCK_TIMEOUT = int(os.getenv("JOB_LOCK_TIMEOUT", 3600))
+# Seconds before the first retry of a failed job; doubles on each attempt
+JOB_RETRY_DELAY = 30
+JOB_SCHEDULES = {
+    "sweep-overdue": {"task": "library.sweep_overdue", "cron": "5 * * * *"},
+    "purge-sessions": {"task": "accounts.purge_sessions", "cron": "30 2 * * *"},
+}
+
+
+# Profile pictures larger than this many pixels get their thumbnails built
+# by a background job instead of during the upload request
+THUMBNAIL_INLINE_MAX_PIXELS = int(os.getenv("THUMBNAIL_INLINE_MAX_PIXELS", 2_000_000))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -104,6 +182,9 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Worker processes used to hash passwords for bulk imports and resets
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", os.cpu_count() or 1))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -127,6 +208,19 @@ STATIC_ROOT = BASE_DIR / "assets"
 MEDIA_ROOT = BASE_DIR / "media"
 
 STATICFILES_DIRS = [BASE_DIR / "static"]
+
+# Uploads waiting for a background import. Kept outside MEDIA_ROOT, which is
+# served without a login, and deleted once the import job is finished.
+IMPORT_ROOT = os.getenv("IMPORT_ROOT", BASE_DIR / "private" / "imports")
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "imports": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": IMPORT_ROOT, "base_url": None},
+    },
+}
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -25,3 +25,14 @@ DATABASES = {
         "NAME": BASE_DIR / "db.sqlite3",  # noqa: F405
     }
 }
+
+# A second SQLite file standing in for a read replica. Nothing replicates
+# to it, so refresh it from the primary by hand:
+#   python -c "import sqlite3; sqlite3.connect('db.sqlite3').backup(sqlite3.connect('replica.sqlite3'))"
+if os.getenv("REPLICA_DB"):  # noqa: F405
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.getenv("REPLICA_DB"),  # noqa: F405
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS = ["replica"]
@@ -7,9 +7,14 @@ ALLOWED_HOSTS = [
 ]  # Example - Need to Replace with the server IP - Do not remove localhost
 
 # Database
+# Connections come from a per-process pool of up to DB_POOL_SIZE and go back
+# to it at the end of each request. DB_POOL_SIZE=0 falls back to Django's
+# persistent connections, one per thread, kept for DB_CONN_MAX_AGE seconds.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))  # noqa: F405
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.mysql",
+        "ENGINE": "school_management.db.mysql",
         "NAME": os.getenv("NAME"),  # noqa: F405
         "USER": os.getenv("USER"),  # noqa: F405
         "PASSWORD": os.getenv("PASSWORD"),  # noqa: F405
@@ -18,5 +23,22 @@ DATABASES = {
         "OPTIONS": {
             "init_command": "SET sql_mode='STRICT_TRANS_TABLES'",
         },
+        "POOL": {
+            "ENABLED": DB_POOL_SIZE > 0,
+            "MAX_SIZE": DB_POOL_SIZE,
+            # Seconds a request waits for a free connection
+            "TIMEOUT": int(os.getenv("DB_POOL_TIMEOUT", 10)),  # noqa: F405
+            # Kept well under the server's wait_timeout (8 hours by default)
+            "MAX_LIFETIME": int(os.getenv("DB_POOL_MAX_LIFETIME", 1800)),  # noqa: F405
+            "PRE_PING": True,
+        },
+        "CONN_MAX_AGE": 0 if DB_POOL_SIZE > 0 else int(os.getenv("DB_CONN_MAX_AGE", 60)),  # noqa: F405
+        "CONN_HEALTH_CHECKS": True,
     }
 }
+
+# Read replicas, comma separated; same credentials as the primary
+REPLICA_HOSTS = [host.strip() for host in os.getenv("REPLICA_HOSTS", "").split(",") if host.strip()]  # noqa: F405
+for number, host in enumerate(REPLICA_HOSTS, start=1):
+    DATABASES[f"replica{number}"] = {**DATABASES["default"], "HOST": host, "TEST": {"MIRROR": "default"}}
+DATABASE_REPLICAS = [f"replica{number}" for number in range(1, len(REPLICA_HOSTS) + 1)]
@@ -0,0 +1,41 @@
+from .production import *  # noqa: F401, F403
+
+# Production on a single SQLite file, for campuses without a MySQL server.
+# Run with DJANGO_SETTINGS_MODULE=school_management.settings.sqlite.
+#
+# WAL lets readers carry on while one connection writes, and NORMAL sync
+# only fsyncs at checkpoints (a power cut can lose the last commits, never
+# corrupt the file). Transactions start with BEGIN IMMEDIATE so they take
+# the write lock up front: a deferred transaction that reads and then
+# writes fails at once when another writer got in between, without
+# waiting for the busy timeout. Writes that still time out are retried
+# with backoff (school_management/db/sqlite3/base.py).
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))}",  # noqa: F405
+    # Negative values are KiB rather than pages
+    f"PRAGMA cache_size=-{int(os.getenv('SQLITE_CACHE_KB', 64 * 1024))}",  # noqa: F405
+    "PRAGMA temp_store=MEMORY",
+]
+
+DATABASES = {
+    "default": {
+        "ENGINE": "school_management.db.sqlite3",
+        "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),  # noqa: F405
+        "OPTIONS": {
+            "init_command": ";".join(SQLITE_PRAGMAS),
+            "transaction_mode": "IMMEDIATE",
+            # Seconds a statement waits for the write lock (busy_timeout)
+            "timeout": float(os.getenv("SQLITE_BUSY_TIMEOUT", 5)),  # noqa: F405
+        },
+        "RETRY": {
+            "ATTEMPTS": int(os.getenv("SQLITE_LOCK_RETRIES", 5)),  # noqa: F405
+            "BACKOFF": 0.05,
+        },
+        "POOL": {"ENABLED": DB_POOL_SIZE > 0, "MAX_SIZE": DB_POOL_SIZE},  # noqa: F405
+        "CONN_MAX_AGE": 0 if DB_POOL_SIZE > 0 else int(os.getenv("DB_CONN_MAX_AGE", 60)),  # noqa: F405
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+DATABASE_REPLICAS = []
@@ -0,0 +1,352 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from datetime import date
+
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from accounts import exports
+from accounts.models import Admin, Student
+from management.models import Grade
+from .db import pool as db_pool
+from .db.pool import ConnectionPool, PoolTimeout
+from .db.sqlite3.base import DatabaseWrapper as PooledSQLiteWrapper
+from .middleware import ReplicaPinningMiddleware
+from .routers import ReplicaRouter, replica_reads
+
+
+def forget(pool):
+    """Drop ``pool`` from the process registry and close its idle connections."""
+    with db_pool._pools_lock:
+        for key in [key for key, value in db_pool._pools.items() if value is pool]:
+            del db_pool._pools[key]
+    while pool._idle:
+        pool.discard(pool._idle.pop()[0])
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.usable = True
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.opened = []
+
+    def connect(self):
+        raw = FakeConnection(len(self.opened) + 1)
+        self.opened.append(raw)
+        return raw
+
+    def ping(self, raw):
+        return raw.usable
+
+    def make_pool(self, **options):
+        options.setdefault("max_size", 2)
+        options.setdefault("timeout", 0.05)
+        return ConnectionPool(**options)
+
+    def test_released_connections_are_reused(self):
+        pool = self.make_pool()
+        raw, opened_at = pool.acquire(self.connect, self.ping)
+        pool.release(raw, opened_at)
+        self.assertIs(pool.acquire(self.connect, self.ping)[0], raw)
+        stats = pool.stats()
+        self.assertEqual((stats["connects"], stats["checkouts"], stats["open"], stats["in_use"]), (1, 2, 1, 1))
+
+    def test_max_size_bounds_open_connections(self):
+        pool = self.make_pool()
+        pool.acquire(self.connect, self.ping)
+        pool.acquire(self.connect, self.ping)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(self.connect, self.ping)
+        stats = pool.stats()
+        self.assertEqual((stats["open"], stats["timeouts"], len(self.opened)), (2, 1, 2))
+
+    def test_waiter_gets_a_connection_released_in_time(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        raw, opened_at = pool.acquire(self.connect, self.ping)
+        releaser = threading.Timer(0.05, pool.release, (raw, opened_at))
+        releaser.start()
+        self.addCleanup(releaser.join)
+        self.assertIs(pool.acquire(self.connect, self.ping)[0], raw)
+        self.assertGreater(pool.stats()["wait_ms_max"], 0)
+
+    def test_discard_closes_and_frees_the_slot(self):
+        pool = self.make_pool(max_size=1)
+        raw, _ = pool.acquire(self.connect, self.ping)
+        pool.discard(raw)
+        self.assertTrue(raw.closed)
+        self.assertIsNot(pool.acquire(self.connect, self.ping)[0], raw)
+        stats = pool.stats()
+        self.assertEqual((stats["discards"], stats["connects"], stats["open"]), (1, 2, 1))
+
+    def test_failed_connect_frees_the_slot(self):
+        pool = self.make_pool(max_size=1)
+
+        def refuse():
+            raise OSError("refused")
+
+        with self.assertRaises(OSError):
+            pool.acquire(refuse, self.ping)
+        self.assertEqual(pool.stats()["open"], 0)
+        pool.acquire(self.connect, self.ping)
+
+    def test_expired_connections_are_replaced(self):
+        pool = self.make_pool(max_lifetime=60)
+        raw, opened_at = pool.acquire(self.connect, self.ping)
+        # Too old to go back into the pool.
+        pool.release(raw, opened_at - 61)
+        self.assertTrue(raw.closed)
+
+        raw, opened_at = pool.acquire(self.connect, self.ping)
+        pool.release(raw, opened_at)
+        # Expired while idle: replaced at the next checkout.
+        pool.max_lifetime = 0
+        time.sleep(0.01)
+        self.assertIsNot(pool.acquire(self.connect, self.ping)[0], raw)
+        self.assertTrue(raw.closed)
+        self.assertEqual(pool.stats()["discards"], 2)
+
+    def test_failed_pre_ping_replaces_the_connection(self):
+        pool = self.make_pool()
+        raw, opened_at = pool.acquire(self.connect, self.ping)
+        pool.release(raw, opened_at)
+        raw.usable = False
+        fresh, _ = pool.acquire(self.connect, self.ping)
+        self.assertIsNot(fresh, raw)
+        self.assertTrue(raw.closed)
+        self.assertEqual(pool.stats()["open"], 1)
+
+    def test_pre_ping_can_be_turned_off(self):
+        pool = self.make_pool(pre_ping=False)
+        raw, opened_at = pool.acquire(self.connect, self.ping)
+        pool.release(raw, opened_at)
+        raw.usable = False
+        self.assertIs(pool.acquire(self.connect, self.ping)[0], raw)
+
+
+class PooledSQLiteTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp(prefix="pool-tests-")
+        self.addCleanup(shutil.rmtree, directory)
+        settings = {
+            **connections["default"].settings_dict,
+            "ENGINE": "school_management.db.sqlite3",
+            "NAME": os.path.join(directory, "pooled.sqlite3"),
+            "OPTIONS": {},
+            "POOL": {"MAX_SIZE": 2},
+        }
+        self.wrapper = PooledSQLiteWrapper(settings, alias="pooled")
+        self.addCleanup(self.wrapper.close)
+        self.pool = self.wrapper.get_pool()
+        self.addCleanup(forget, self.pool)
+
+    def query(self):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+    def test_closing_returns_the_connection_to_the_pool(self):
+        self.query()
+        raw = self.wrapper.connection
+        self.wrapper.close()
+        self.query()
+        self.assertIs(self.wrapper.connection, raw)
+        stats = self.pool.stats()
+        self.assertEqual((stats["connects"], stats["checkouts"], stats["discards"]), (1, 2, 0))
+
+    def test_connection_closed_inside_atomic_block_is_discarded(self):
+        self.query()
+        self.wrapper.in_atomic_block = True
+        try:
+            self.wrapper.close()
+        finally:
+            self.wrapper.in_atomic_block = False
+            self.wrapper.connection = None
+        stats = self.pool.stats()
+        self.assertEqual((stats["discards"], stats["open"]), (1, 0))
+
+    def test_connection_closed_after_errors_is_discarded(self):
+        self.query()
+        self.wrapper.errors_occurred = True
+        self.wrapper.close()
+        stats = self.pool.stats()
+        self.assertEqual((stats["discards"], stats["idle"]), (1, 0))
+
+
+class PooledTestDatabaseTests(TransactionTestCase):
+    def test_orm_reads_the_test_database_through_the_pool(self):
+        Grade.objects.create(standard=9, section="B")
+        connections["pooled-default"] = wrapper = PooledSQLiteWrapper(
+            {
+                **connections["default"].settings_dict,
+                "ENGINE": "school_management.db.sqlite3",
+                "POOL": {"MAX_SIZE": 1},
+            },
+            alias="pooled-default",
+        )
+        self.addCleanup(connections.__delitem__, "pooled-default")
+        pool = wrapper.get_pool()
+        self.addCleanup(forget, pool)
+
+        for _ in range(2):
+            grades = Grade.objects.using("pooled-default").values_list("standard", "section")
+            self.assertEqual(list(grades), [(9, "B")])
+            # close() keeps an in-memory database open; for a file it does this.
+            wrapper._close()
+            wrapper.connection = None
+        stats = pool.stats()
+        self.assertEqual((stats["connects"], stats["checkouts"], stats["idle"]), (1, 2, 1))
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "school_management.cache.TieredCache",
+            "OPTIONS": {"NEAR": "near", "FAR": "shared", "NEAR_TIMEOUT": 10},
+        },
+        "near": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tiered-near"},
+        "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tiered-shared"},
+    }
+)
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache, self.near, self.far = caches["default"], caches["near"], caches["shared"]
+        self.cache.clear()
+
+    def test_far_hits_are_copied_to_the_near_tier(self):
+        self.far.set("key", "value")
+        self.assertIsNone(self.near.get("key"))
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertEqual(self.near.get("key"), "value")
+        self.assertEqual(self.cache.get("missing", "default"), "default")
+
+    def test_writes_go_to_both_tiers_with_a_short_near_timeout(self):
+        with mock.patch.object(self.near, "set", wraps=self.near.set) as near_set:
+            self.cache.set("key", "value", 600)
+        self.assertEqual(near_set.call_args.args[2], 10)
+        self.assertEqual((self.near.get("key"), self.far.get("key")), ("value", "value"))
+
+    def test_add_only_succeeds_when_the_shared_tier_lacks_the_key(self):
+        self.far.set("key", "theirs")
+        self.assertFalse(self.cache.add("key", "mine"))
+        self.assertTrue(self.cache.add("other", "mine"))
+        self.assertEqual(self.near.get("other"), "mine")
+
+    def test_delete_and_incr_drop_the_near_copy(self):
+        self.cache.set("gone", "value")
+        self.cache.delete("gone")
+        self.assertIsNone(self.cache.get("gone"))
+
+        self.cache.set("counter", 1)
+        self.assertEqual(self.cache.incr("counter"), 2)
+        self.assertIsNone(self.near.get("counter"))
+        self.assertEqual(self.cache.get("counter"), 2)
+
+
+@override_settings(
+    DATABASE_REPLICAS=["replica"],
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+        "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "shared"},
+    },
+)
+class ReplicaRoutingTests(TestCase):
+    """
+    "replica" mirrors the test database: it is the default connection under
+    a second alias, so routed reads see the test's rows and the alias a
+    query was sent to can still be told apart.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.grade = Grade.objects.create(standard=5, section="C")
+        for number in range(3):
+            Student.objects.create(
+                username=f"pupil{number}",
+                grade=cls.grade,
+                admission_date=date(2024, 6, 1),
+                parent_name="Parent",
+                parent_contact_number="9000000000",
+            )
+        cls.admin = Admin.objects.create(username="head")
+
+    def setUp(self):
+        connections["replica"] = connections[DEFAULT_DB_ALIAS]
+        self.addCleanup(connections.__delitem__, "replica")
+        self.client.force_login(self.admin)
+
+    def request(self, replica_allowed=True):
+        request = RequestFactory().get("/")
+        request.replica_allowed = replica_allowed
+        return request
+
+    def test_router_reads_from_the_replica_only_inside_replica_reads(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Grade))
+        with replica_reads(self.request()) as alias:
+            self.assertEqual(alias, "replica")
+            self.assertEqual(router.db_for_read(Grade), "replica")
+            self.assertEqual(router.db_for_write(Grade), DEFAULT_DB_ALIAS)
+            # Related rows follow the instance they hang off.
+            self.assertEqual(router.db_for_read(Grade, instance=self.grade), DEFAULT_DB_ALIAS)
+        self.assertIsNone(router.db_for_read(Grade))
+        self.assertFalse(router.allow_migrate("replica", "management"))
+
+    def test_requests_that_may_not_use_a_replica_stay_on_default(self):
+        request = self.request(replica_allowed=False)
+        with replica_reads(request) as alias:
+            self.assertIsNone(alias)
+            self.assertEqual(Grade.objects.all().db, DEFAULT_DB_ALIAS)
+        self.assertEqual(request.db_route[0], DEFAULT_DB_ALIAS)
+
+        with override_settings(DATABASE_REPLICAS=[]), replica_reads(self.request()) as alias:
+            self.assertIsNone(alias)
+
+    def test_opted_in_get_reads_from_the_replica(self):
+        response = self.client.get(reverse("student_list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.db_route, ("replica", "read-only view"))
+        self.assertEqual({student._state.db for student in response.context["students"]}, {"replica"})
+
+    def test_a_post_pins_later_gets_to_default(self):
+        response = self.client.post(reverse("department_create"), {"name": "Arts", "description": ""})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(ReplicaPinningMiddleware.cookie_name, response.cookies)
+
+        response = self.client.get(reverse("student_list"))
+        self.assertEqual(response.wsgi_request.db_route, (DEFAULT_DB_ALIAS, "pinned after a write"))
+
+        self.client.cookies.pop(ReplicaPinningMiddleware.cookie_name)
+        response = self.client.get(reverse("student_list"))
+        self.assertEqual(response.wsgi_request.db_route[0], "replica")
+
+    def test_streamed_export_reads_from_the_database_chosen_in_get(self):
+        read_from = []
+        keyset_rows = exports.keyset_rows
+
+        def recording_rows(queryset, *args, **kwargs):
+            for row in keyset_rows(queryset, *args, **kwargs):
+                read_from.append(queryset.db)
+                yield row
+
+        with mock.patch.object(exports, "keyset_rows", recording_rows):
+            response = self.client.get(reverse("student_export"))
+            self.assertEqual(response.wsgi_request.db_route[0], "replica")
+            # Nothing is read until the body is consumed, after dispatch.
+            self.assertEqual(read_from, [])
+            lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(read_from, ["replica"] * 3)
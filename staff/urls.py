@@ -4,5 +4,5 @@ from . import views
 
 
 urlpatterns = [
-    path('staff/dashboard/', views.StaffDashboard.as_view(), name='staff_dashboard'),
+    path('staff/dashboard/', views.staff_dashboard, name='staff_dashboard'),
 ]
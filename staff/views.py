@@ -1,20 +1,42 @@
-from django.views.generic import TemplateView
-from django.utils.decorators import method_decorator
+from functools import partial
+
+from django.template.response import TemplateResponse
+from accounts.concurrency import gather_queries
 from accounts.decorators import role_required
+from administration.counters import get_counters
+from library.circulation import librarian_stats
+from management.models import Grade
+from school_management.routers import reads_from_replica
 
 
-@method_decorator(
-    role_required(
-        allowed_roles=[
-            "staff",
-        ]
-    ),
-    name="dispatch",
-)
-class StaffDashboard(TemplateView):
-    template_name = "staff/staff_dashboard.html"
+def grades_in_charge(staff_id):
+    return list(
+        Grade.objects.filter(in_charge_id=staff_id)
+        .select_related("rollup")
+        .order_by("standard", "section")
+    )
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context["page_title"] = "staff Dashboard"
-        return context
+
+@role_required(
+    allowed_roles=[
+        "staff",
+    ]
+)
+@reads_from_replica
+async def staff_dashboard(request):
+    grades, counters, stats = await gather_queries(
+        partial(grades_in_charge, request.user.pk),
+        get_counters,
+        partial(librarian_stats, top=0),
+    )
+    rollups = [grade.rollup for grade in grades if hasattr(grade, "rollup")]
+    context = {
+        "page_title": "staff Dashboard",
+        "grades_in_charge": grades,
+        "roster_size": sum(rollup.student_count for rollup in rollups),
+        "pending_fee_count": sum(rollup.pending_fee_count for rollup in rollups),
+        "pending_fee_amount": sum(rollup.pending_fee_amount for rollup in rollups),
+        "books_count": counters["books_count"],
+        "books_to_return": stats["books_out"],
+    }
+    return TemplateResponse(request, "staff/staff_dashboard.html", context)